@@ -0,0 +1,224 @@
+"""
+Benchmark every CLI subcommand and parse phase against a synthetic trace.
+
+    uv run python -m benchmarks.run --actions 20000 --frames 20000 -o tmp/bench/current.json
+    uv run python -m benchmarks.run compare tmp/bench/v0.2.0.json tmp/bench/current.json
+"""
+
+import contextlib
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+import click
+from click.testing import CliRunner
+
+from benchmarks.synthetic import TraceShape, write_synthetic_trace
+from playwright_trace_analyzer.cache import NO_CACHE_ENV
+from playwright_trace_analyzer.cli import cli
+from playwright_trace_analyzer.parser import SECTIONS, load_sections
+
+COMMANDS = {
+    "summary": ["summary"],
+    "actions": ["actions"],
+    "console": ["console"],
+    "network": ["network"],
+    "network-failed": ["network", "--failed-only"],
+    "metadata": ["metadata"],
+    "screenshots": ["screenshots"],
+    "screenshots-action-only": ["screenshots", "--action-only"],
+    "screenshots-limit": ["screenshots", "--limit", "5"],
+}
+
+
+@click.group(invoke_without_command=True)
+@click.option("--actions", type=int, default=TraceShape().actions, show_default=True)
+@click.option(
+    "--console-per-action",
+    type=int,
+    default=TraceShape().console_per_action,
+    show_default=True,
+)
+@click.option(
+    "--network-requests",
+    type=int,
+    default=TraceShape().network_requests,
+    show_default=True,
+)
+@click.option("--frames", type=int, default=TraceShape().frames, show_default=True)
+@click.option(
+    "--frame-snapshots",
+    type=int,
+    default=TraceShape().frame_snapshots,
+    show_default=True,
+)
+@click.option(
+    "--frame-width", type=int, default=TraceShape().frame_width, show_default=True
+)
+@click.option(
+    "--frame-height", type=int, default=TraceShape().frame_height, show_default=True
+)
+@click.option(
+    "--trace-entries", type=int, default=TraceShape().trace_entries, show_default=True
+)
+@click.option(
+    "--repeat",
+    type=int,
+    default=3,
+    show_default=True,
+    help="Timing runs per case; the fastest is kept",
+)
+@click.option(
+    "--only", multiple=True, help="Only run cases whose name starts with this prefix"
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(path_type=Path),
+    default=Path("tmp/bench/results.json"),
+    show_default=True,
+)
+@click.pass_context
+def main(
+    ctx: click.Context,
+    repeat: int,
+    only: tuple[str, ...],
+    output: Path,
+    **shape_options: int,
+):
+    """Generate a synthetic trace, time and memory-profile each case, and write results as JSON."""
+    if ctx.invoked_subcommand is not None:
+        return
+
+    shape = TraceShape(**shape_options)
+
+    # measure parsing, not the on-disk section cache
+    os.environ[NO_CACHE_ENV] = "1"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path = write_synthetic_trace(Path(tmp) / "trace.zip", shape)
+        cases = _build_cases(trace_path, Path(tmp) / "screenshots")
+
+        results = []
+        for name, case in cases.items():
+            if only and not name.startswith(only):
+                continue
+
+            seconds = min(_time_case(case) for _ in range(repeat))
+            peak_bytes = _peak_memory(case)
+            results.append({"name": name, "seconds": seconds, "peak_bytes": peak_bytes})
+            click.echo(f"{name:40} {seconds:9.3f}s {peak_bytes / 1024 / 1024:9.1f} MiB")
+
+        report = {
+            "package_version": _package_version(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "shape": shape.model_dump(),
+            "trace_bytes": trace_path.stat().st_size,
+            "results": results,
+        }
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    click.echo(f"wrote {output}")
+
+
+@main.command()
+@click.argument("baseline", type=click.Path(exists=True, path_type=Path))
+@click.argument("candidate", type=click.Path(exists=True, path_type=Path))
+def compare(baseline: Path, candidate: Path):
+    """Compare two result files case by case."""
+    before = {r["name"]: r for r in json.loads(baseline.read_text())["results"]}
+    after = {r["name"]: r for r in json.loads(candidate.read_text())["results"]}
+
+    click.echo(f"{'case':40} {'seconds':>20} {'peak MiB':>20}")
+    for name, result in after.items():
+        previous = before.get(name)
+        if previous is None:
+            click.echo(f"{name:40} {'new':>20}")
+            continue
+
+        time_ratio = (
+            result["seconds"] / previous["seconds"]
+            if previous["seconds"]
+            else float("inf")
+        )
+        memory_ratio = (
+            result["peak_bytes"] / previous["peak_bytes"]
+            if previous["peak_bytes"]
+            else float("inf")
+        )
+        click.echo(
+            f"{name:40} {previous['seconds']:8.3f} -> {result['seconds']:7.3f} ({time_ratio:4.2f}x)"
+            f" {previous['peak_bytes'] / 1024 / 1024:7.1f} -> {result['peak_bytes'] / 1024 / 1024:7.1f}"
+            f" ({memory_ratio:4.2f}x)"
+        )
+
+
+def _build_cases(
+    trace_path: Path, screenshot_dir: Path
+) -> dict[str, Callable[[], None]]:
+    runner = CliRunner()
+    cases: dict[str, Callable[[], None]] = {}
+
+    for name, args in COMMANDS.items():
+        extra = (
+            ["--output-dir", str(screenshot_dir)] if args[0] == "screenshots" else []
+        )
+        cases[f"cli:{name}"] = _cli_case(runner, [*args, str(trace_path), *extra])
+
+    cases["parse:all-sections"] = lambda: _load(trace_path, set(SECTIONS))
+    for section in SECTIONS:
+        cases[f"parse:{section}"] = lambda section=section: _load(trace_path, {section})
+
+    return cases
+
+
+def _cli_case(runner: CliRunner, args: list[str]) -> Callable[[], None]:
+    def run() -> None:
+        result = runner.invoke(cli, args, catch_exceptions=False)
+        assert result.exit_code == 0, result.output
+
+    return run
+
+
+def _load(trace_path: Path, sections: set[str]) -> None:
+    load_sections(trace_path, sections)
+
+
+def _time_case(case: Callable[[], None]) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    case()
+    return time.perf_counter() - start
+
+
+def _peak_memory(case: Callable[[], None]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            case()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _package_version() -> str | None:
+    try:
+        return version("playwright-trace-analyzer")
+    except PackageNotFoundError:
+        return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import hashlib
+import io
+import json
+import random
+import zipfile
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+from pydantic import BaseModel
+
+PAGES = ["page@1", "page@2"]
+
+
+class TraceShape(BaseModel):
+    actions: int = 2_000
+    console_per_action: int = 2
+    network_requests: int = 5_000
+    frames: int = 5_000
+    frame_snapshots: int = 2_000
+    frame_width: int = 640
+    frame_height: int = 360
+    trace_entries: int = 1
+    seed: int = 0
+
+
+def write_synthetic_trace(path: Path, shape: TraceShape) -> Path:
+    """
+    Write a trace.zip shaped like a real Playwright recording.
+
+    Screencast frames hold each scene for about ten frames, mixing byte-identical repeats (same sha1) with
+    re-encoded near-duplicates, so deduplication has realistic work to do.
+    """
+    rng = random.Random(shape.seed)
+    images = _build_scene_images(shape, rng)
+
+    trace_events = _build_trace_events(shape, rng, images)
+    network_events = [
+        _build_resource_snapshot(i, rng) for i in range(shape.network_requests)
+    ]
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for index, chunk in enumerate(_split(trace_events, shape.trace_entries)):
+            zf.writestr(f"{index}-trace.trace", _ndjson(chunk))
+
+        for index, chunk in enumerate(_split(network_events, shape.trace_entries)):
+            zf.writestr(f"{index}-trace.network", _ndjson(chunk))
+
+        for sha1, data in images.items():
+            zf.writestr(zipfile.ZipInfo(f"resources/{sha1}"), data, zipfile.ZIP_STORED)
+
+    return path
+
+
+def _build_trace_events(
+    shape: TraceShape, rng: random.Random, images: dict[str, bytes]
+) -> list[dict]:
+    events: list[dict] = [
+        {
+            "type": "context-options",
+            "title": "synthetic benchmark trace",
+            "platform": "linux",
+            "wallTime": 1_700_000_000_000.0,
+            "monotonicTime": 1_000.0,
+            "sdkLanguage": "python",
+            "contextOptions": {
+                "baseURL": "https://example.com",
+                "viewport": {"width": shape.frame_width, "height": shape.frame_height},
+            },
+            "browser": {"name": "chromium", "channel": "chrome"},
+            "version": "1.50.0",
+        }
+    ]
+
+    duration = max(shape.actions, 1) * 100.0
+    frame_shas = _frame_sha_sequence(shape.frames, list(images))
+
+    for i in range(shape.actions):
+        start = 1_000.0 + i * 100.0
+        call_id = f"call@{i}"
+        page_id = rng.choice(PAGES)
+        events.append(
+            {
+                "type": "before",
+                "callId": call_id,
+                "startTime": start,
+                "class": "Frame",
+                "method": rng.choice(["click", "fill", "goto", "waitForSelector"]),
+                "params": {"selector": f"#element-{i}", "strict": True},
+                "pageId": page_id,
+                "stack": [{"file": "test_app.py", "line": i % 500, "column": 4}],
+            }
+        )
+        events.append(
+            {
+                "type": "log",
+                "callId": call_id,
+                "time": start + 1,
+                "message": f"waiting for #element-{i}",
+            }
+        )
+
+        for j in range(shape.console_per_action):
+            events.append(
+                {
+                    "type": "console",
+                    "messageType": rng.choice(["log", "log", "warning", "error"]),
+                    "text": f"console message {i}.{j}",
+                    "time": start + 2 + j,
+                    "pageId": page_id,
+                    "location": {
+                        "url": "https://example.com/app.js",
+                        "lineNumber": j,
+                        "columnNumber": 1,
+                    },
+                }
+            )
+
+        after: dict = {
+            "type": "after",
+            "callId": call_id,
+            "endTime": start + rng.uniform(5, 95),
+        }
+        if rng.random() < 0.02:
+            after["error"] = {
+                "message": "Timeout 5000ms exceeded",
+                "stack": "TimeoutError\n  at click",
+            }
+        events.append(after)
+
+    for i, sha1 in enumerate(frame_shas):
+        events.append(
+            {
+                "type": "screencast-frame",
+                "pageId": PAGES[i % len(PAGES)],
+                "sha1": sha1,
+                "width": shape.frame_width,
+                "height": shape.frame_height,
+                "timestamp": 1_000.0 + duration * i / max(shape.frames, 1),
+            }
+        )
+
+    for i in range(shape.frame_snapshots):
+        events.append(
+            {
+                "type": "frame-snapshot",
+                "snapshot": {
+                    "callId": f"call@{i % max(shape.actions, 1)}",
+                    "snapshotName": f"before@call@{i}",
+                    "pageId": rng.choice(PAGES),
+                    "html": [
+                        "HTML",
+                        {},
+                        [
+                            "BODY",
+                            {},
+                            *(["DIV", {"class": "row"}, "x" * 40] for _ in range(40)),
+                        ],
+                    ],
+                    "viewport": {
+                        "width": shape.frame_width,
+                        "height": shape.frame_height,
+                    },
+                    "timestamp": 1_000.0 + i * 10.0,
+                },
+            }
+        )
+
+    # events are interleaved by time the way playwright writes them
+    events[1:] = sorted(events[1:], key=_event_time)
+    return events
+
+
+def _build_resource_snapshot(index: int, rng: random.Random) -> dict:
+    status = rng.choices([200, 204, 304, 404, 500, 0], weights=[80, 5, 10, 2, 2, 1])[0]
+    snapshot: dict = {
+        "request": {
+            "method": rng.choice(["GET", "GET", "GET", "POST"]),
+            "url": f"https://example.com/{rng.choice(['api/users', 'api/items', 'static'])}/{index}",
+            "headers": [{"name": "accept", "value": "*/*"}],
+        },
+        "response": {
+            "status": status,
+            "statusText": "OK" if status < 400 else "Error",
+            "headers": [
+                {
+                    "name": "content-type",
+                    "value": rng.choice(["application/json", "text/css", "image/png"]),
+                }
+            ],
+            "content": {"size": rng.randint(0, 50_000), "mimeType": "application/json"},
+        },
+        "timings": {
+            "dns": -1,
+            "connect": rng.uniform(0, 5),
+            "ssl": -1,
+            "send": rng.uniform(0, 1),
+            "wait": rng.uniform(1, 400),
+            "receive": rng.uniform(0, 50),
+        },
+        "_monotonicTime": 1_000.0 + index * 10.0,
+    }
+    if status == 0:
+        snapshot["_failureText"] = "net::ERR_CONNECTION_RESET"
+
+    return {"type": "resource-snapshot", "snapshot": snapshot}
+
+
+def _build_scene_images(shape: TraceShape, rng: random.Random) -> dict[str, bytes]:
+    scenes = max(1, shape.frames // 10)
+    images = {}
+
+    for scene in range(scenes):
+        image = Image.new(
+            "RGB", (shape.frame_width, shape.frame_height), (250, 250, 250)
+        )
+        draw = ImageDraw.Draw(image)
+        for _ in range(12):
+            x = rng.randrange(shape.frame_width)
+            y = rng.randrange(shape.frame_height)
+            color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+            draw.rectangle(
+                (x, y, x + shape.frame_width // 6, y + shape.frame_height // 10),
+                fill=color,
+            )
+        draw.text((10, 10), f"scene {scene}", fill=(0, 0, 0))
+
+        # a second encoding of the same scene stands in for a near-identical repaint
+        for quality in (80, 75):
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=quality)
+            data = buffer.getvalue()
+            images[hashlib.sha1(data).hexdigest()] = data
+
+    return images
+
+
+def _frame_sha_sequence(frames: int, shas: list[str]) -> list[str]:
+    sequence = []
+    for i in range(frames):
+        scene = (i // 10) % (len(shas) // 2)
+        variant = 1 if i % 10 in (4, 5) else 0
+        sequence.append(shas[scene * 2 + variant])
+    return sequence
+
+
+def _event_time(event: dict) -> float:
+    return (
+        event.get("startTime")
+        or event.get("time")
+        or event.get("endTime")
+        or event.get("timestamp")
+        or event.get("snapshot", {}).get("timestamp", 0)
+    )
+
+
+def _split(events: list[dict], parts: int) -> list[list[dict]]:
+    size = -(-len(events) // max(parts, 1))
+    return [events[i : i + size] for i in range(0, len(events), size)] or [[]]
+
+
+def _ndjson(events: list[dict]) -> str:
+    return "\n".join(json.dumps(event) for event in events) + "\n"
@@ -0,0 +1,281 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
+import zipfile
+import zlib
+from pathlib import Path
+
+from structlog_config import get_logger
+
+log = get_logger()
+
+# bump whenever the pickled section layout changes so stale entries are never read
+CACHE_VERSION = 4
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_DIR_ENV = "PLAYWRIGHT_TRACE_ANALYZER_CACHE_DIR"
+NO_CACHE_ENV = "PLAYWRIGHT_TRACE_ANALYZER_NO_CACHE"
+
+# bump whenever the way frame diffs are measured changes, so stale fractions are dropped
+FRAME_DIFF_VERSION = 1
+
+# a row is about 200 bytes, so this caps the frame diff database at a few tens of megabytes
+DEFAULT_MAX_FRAME_DIFFS = 200_000
+
+FRAME_DIFF_DB = "frame-diffs.sqlite"
+
+# seconds to wait for another process's lock on the frame diff database before going without it
+FRAME_DIFF_TIMEOUT = 10
+
+
+def cache_directory() -> Path | None:
+    """The cache directory configured by the environment, or None when caching is disabled."""
+    if os.environ.get(NO_CACHE_ENV):
+        return None
+
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if directory:
+        return Path(directory)
+
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    base = Path(cache_home) if cache_home else Path.home() / ".cache"
+    return base / "playwright-trace-analyzer"
+
+
+class TraceCache:
+    """
+    On-disk cache of extracted trace sections, one zlib-compressed pickle per (trace, section).
+
+    Entries are written atomically so concurrent workers can share a directory, and the least recently read
+    entries are evicted once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls) -> "TraceCache | None":
+        directory = cache_directory()
+        return cls(directory) if directory else None
+
+    def trace_key(self, trace_path: Path) -> str:
+        stat = trace_path.stat()
+        digest = hashlib.sha256(
+            f"{CACHE_VERSION}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+        )
+
+        with zipfile.ZipFile(trace_path) as zf:
+            for info in zf.infolist():
+                digest.update(f"{info.filename}:{info.CRC}:{info.file_size}".encode())
+
+        return digest.hexdigest()
+
+    def get(self, key: str, section: str) -> object | None:
+        path = self._entry_path(key, section)
+
+        try:
+            payload = path.read_bytes()
+            value = pickle.loads(zlib.decompress(payload))
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError):
+            # a truncated or stale entry is treated as a miss and overwritten by the next put
+            log.debug("ignoring unreadable trace cache entry", path=path)
+            return None
+
+        # the mtime doubles as the last-used time for LRU eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return value
+
+    def put(self, key: str, section: str, value: object) -> None:
+        """Store `value`; an unwritable cache directory skips the entry, since caching must never fail a command."""
+        payload = zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL), 1)
+        tmp_name = None
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=self.directory, prefix=".tmp-", delete=False
+            ) as tmp:
+                tmp_name = tmp.name
+                tmp.write(payload)
+
+            os.replace(tmp_name, self._entry_path(key, section))
+            self._evict()
+        except OSError:
+            log.debug(
+                "trace cache entry not written",
+                directory=self.directory,
+                section=section,
+            )
+            if tmp_name is not None:
+                Path(tmp_name).unlink(missing_ok=True)
+
+    def _entry_path(self, key: str, section: str) -> Path:
+        return self.directory / f"{key}-{section}.bin"
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.bin"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            # another worker may have evicted the same entry already
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+class FrameDiffCache:
+    """
+    Persistent mismatch fractions of screencast frame pairs, keyed by the sha1 pair in sorted order since the diff
+    is symmetric. Either fraction may be unknown: `thumbnail` is measured on reduced-resolution frames and `full`
+    only when the thumbnails don't settle a pair. Fractions don't depend on the dedupe threshold, so any threshold
+    can be answered from them.
+
+    Reads hit sqlite directly; new rows and last-used times are buffered and written in one transaction on
+    `close`, which also evicts the least recently used rows past `max_rows`.
+    """
+
+    def __init__(self, path: Path, max_rows: int = DEFAULT_MAX_FRAME_DIFFS):
+        self.path = path
+        self.max_rows = max_rows
+        self._pending: dict[tuple[str, str], tuple[float | None, float | None]] = {}
+        self._used: set[tuple[str, str]] = set()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=FRAME_DIFF_TIMEOUT)
+        try:
+            self._migrate()
+        except sqlite3.DatabaseError as error:
+            if isinstance(error, sqlite3.OperationalError) and not self._corrupt():
+                # a busy database belongs to another process; leave it be
+                self._db.close()
+                raise
+
+            # a corrupt database is rebuilt rather than failing the command
+            log.debug("recreating unreadable frame diff cache", path=path)
+            self._db.close()
+            path.unlink(missing_ok=True)
+            self._db = sqlite3.connect(path, timeout=FRAME_DIFF_TIMEOUT)
+            self._migrate()
+
+    @classmethod
+    def from_env(cls) -> "FrameDiffCache | None":
+        """The shared cache, or None when caching is disabled or its database can't be opened."""
+        directory = cache_directory()
+        if not directory:
+            return None
+
+        try:
+            return cls(directory / FRAME_DIFF_DB)
+        except (OSError, sqlite3.Error):
+            log.debug("frame diff cache unavailable", directory=directory)
+            return None
+
+    def _corrupt(self) -> bool:
+        try:
+            (result,) = self._db.execute("PRAGMA quick_check").fetchone()
+        except sqlite3.OperationalError:
+            return False
+        except sqlite3.DatabaseError:
+            return True
+        return result != "ok"
+
+    def _migrate(self) -> None:
+        (version,) = self._db.execute("PRAGMA user_version").fetchone()
+        if version == FRAME_DIFF_VERSION:
+            return
+
+        with self._db:
+            self._db.execute("DROP TABLE IF EXISTS frame_diffs")
+            self._db.execute(
+                "CREATE TABLE frame_diffs (sha1_a TEXT, sha1_b TEXT, thumbnail REAL, full REAL, used REAL,"
+                " PRIMARY KEY (sha1_a, sha1_b)) WITHOUT ROWID"
+            )
+            self._db.execute("CREATE INDEX frame_diffs_used ON frame_diffs (used)")
+            self._db.execute(f"PRAGMA user_version = {FRAME_DIFF_VERSION}")
+
+    def get(self, sha1_a: str, sha1_b: str) -> tuple[float | None, float | None]:
+        """The `(thumbnail, full)` fractions known for a pair, with None for either one not measured yet."""
+        key = _pair_key(sha1_a, sha1_b)
+        if key in self._pending:
+            return self._pending[key]
+
+        try:
+            row = self._db.execute(
+                "SELECT thumbnail, full FROM frame_diffs WHERE sha1_a = ? AND sha1_b = ?",
+                key,
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # another process holds the database; the pair is measured again instead
+            log.debug("could not read frame diff cache", path=self.path)
+            return None, None
+        if row is None:
+            return None, None
+
+        self._used.add(key)
+        return row
+
+    def put(
+        self, sha1_a: str, sha1_b: str, thumbnail: float | None, full: float | None
+    ) -> None:
+        self._pending[_pair_key(sha1_a, sha1_b)] = (thumbnail, full)
+
+    def close(self) -> None:
+        now = time.time()
+        try:
+            with self._db:
+                self._db.executemany(
+                    "UPDATE frame_diffs SET used = ? WHERE sha1_a = ? AND sha1_b = ?",
+                    [(now, *key) for key in self._used - self._pending.keys()],
+                )
+                # keep whatever was measured before, so a full fraction is never replaced by an unknown one
+                self._db.executemany(
+                    "INSERT INTO frame_diffs VALUES (?, ?, ?, ?, ?) ON CONFLICT (sha1_a, sha1_b) DO UPDATE SET"
+                    " thumbnail = coalesce(excluded.thumbnail, thumbnail),"
+                    " full = coalesce(excluded.full, full), used = excluded.used",
+                    [
+                        (*key, *fractions, now)
+                        for key, fractions in self._pending.items()
+                    ],
+                )
+                self._evict()
+        except sqlite3.OperationalError:
+            # another process held the database past the timeout; these results are simply not cached
+            log.debug("could not write frame diff cache", path=self.path)
+        finally:
+            self._db.close()
+
+    def _evict(self) -> None:
+        (count,) = self._db.execute("SELECT count(*) FROM frame_diffs").fetchone()
+        if count <= self.max_rows:
+            return
+
+        self._db.execute(
+            "DELETE FROM frame_diffs WHERE (sha1_a, sha1_b) IN"
+            " (SELECT sha1_a, sha1_b FROM frame_diffs ORDER BY used LIMIT ?)",
+            (count - self.max_rows,),
+        )
+
+
+def _pair_key(sha1_a: str, sha1_b: str) -> tuple[str, str]:
+    return (sha1_a, sha1_b) if sha1_a <= sha1_b else (sha1_b, sha1_a)
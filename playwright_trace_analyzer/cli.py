@@ -1,11 +1,39 @@
-import re
 import zipfile
+from collections.abc import Iterable
+from contextlib import closing
+from functools import partial
+from itertools import islice
 from pathlib import Path
 
 import click
 
+from playwright_trace_analyzer.cache import FrameDiffCache, TraceCache
 from playwright_trace_analyzer.parser import parse_trace_file
-from playwright_trace_analyzer.formatters import json_fmt, markdown
+from playwright_trace_analyzer.response_bodies import (
+    DEFAULT_MAX_BODY_BYTES,
+    read_response_body,
+)
+from playwright_trace_analyzer.formatters import json_fmt, markdown, ndjson_fmt
+
+
+def _validate_statuses(
+    ctx: click.Context, param: click.Parameter, value: tuple[str, ...]
+) -> tuple[str, ...]:
+    from playwright_trace_analyzer.extractors.network import STATUS_SPEC_PATTERN
+
+    statuses = tuple(spec.lower() for spec in value)
+    for spec in statuses:
+        if not STATUS_SPEC_PATTERN.fullmatch(spec):
+            raise click.BadParameter(
+                f"{spec!r} is not a status code or class such as 404 or 5xx"
+            )
+    return statuses
+
+
+def _echo_lines(lines: Iterable[str]) -> None:
+    """Write each line as soon as it is produced, so readers like `jq` or `head` see records immediately."""
+    for line in lines:
+        click.echo(line)
 
 
 @click.group(invoke_without_command=True)
@@ -36,9 +64,34 @@ def cli(ctx):
     show_default=True,
     help="Number of actions in summary (0 for all)",
 )
-def summary(trace_file: Path, format: str, page: str | None, last: int):
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Worker processes for decoding traces with several .trace/.network entries",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Write JSON without indentation",
+)
+def summary(
+    trace_file: Path,
+    format: str,
+    page: str | None,
+    last: int,
+    jobs: int,
+    compact: bool,
+):
     """Get a high-level summary of the trace including metadata, errors, console warnings, failed network requests, and action timeline."""
-    data = parse_trace_file(trace_file)
+    data = parse_trace_file(
+        trace_file,
+        ["metadata", "errors", "console_messages", "network_requests", "actions"],
+        TraceCache.from_env(),
+        jobs,
+    )
 
     if page:
         data.actions = [a for a in data.actions if a.page_id == page]
@@ -46,7 +99,7 @@ def summary(trace_file: Path, format: str, page: str | None, last: int):
         data.errors = [e for e in data.errors if e.page_id == page]
 
     if format == "json":
-        output = json_fmt.format_trace_data(data, last)
+        output = json_fmt.format_trace_data(data, last, indent=not compact)
     else:
         output = markdown.format_trace_data(data, last)
 
@@ -58,16 +111,69 @@ def summary(trace_file: Path, format: str, page: str | None, last: int):
 @click.option(
     "--format",
     "-f",
-    type=click.Choice(["json", "markdown"]),
+    type=click.Choice(["json", "markdown", "ndjson"]),
     default="json",
     show_default=True,
-    help="Output format",
+    help="Output format; ndjson writes one record per line as it is read",
 )
 @click.option("--page", "-p", help="Filter by pageId")
 @click.option("--errors-only", is_flag=True, help="Only show failed actions")
-def actions(trace_file: Path, format: str, page: str | None, errors_only: bool):
+@click.option(
+    "--with-network",
+    is_flag=True,
+    help="List the network requests started while each action ran",
+)
+@click.option(
+    "--with-console",
+    is_flag=True,
+    help="List the console messages logged while each action ran",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Worker processes for decoding traces with several .trace/.network entries",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Write JSON without indentation",
+)
+def actions(
+    trace_file: Path,
+    format: str,
+    page: str | None,
+    errors_only: bool,
+    with_network: bool,
+    with_console: bool,
+    jobs: int,
+    compact: bool,
+):
     """View all actions executed during the test with timing, parameters, log messages, and error details."""
-    data = parse_trace_file(trace_file)
+    from playwright_trace_analyzer.extractors.actions import ActionIndex
+
+    sections = ["actions"]
+    if with_network:
+        sections.append("network_requests")
+    if with_console:
+        sections.append("console_messages")
+
+    data = parse_trace_file(trace_file, sections, TraceCache.from_env(), jobs)
+
+    # records are attributed against every action, so filtering actions never moves them to another one
+    network = console = None
+    if with_network or with_console:
+        index = ActionIndex(data.actions)
+        if with_network:
+            network = index.attribute(
+                data.network_requests, lambda r: (r.page_id, r.start_time)
+            )
+        if with_console:
+            console = index.attribute(
+                data.console_messages, lambda m: (m.page_id, m.time)
+            )
 
     filtered_actions = data.actions
 
@@ -77,10 +183,16 @@ def actions(trace_file: Path, format: str, page: str | None, errors_only: bool):
     if errors_only:
         filtered_actions = [a for a in filtered_actions if a.error]
 
+    if format == "ndjson":
+        _echo_lines(ndjson_fmt.format_actions(filtered_actions, network, console))
+        return
+
     if format == "json":
-        output = json_fmt.format_actions(filtered_actions)
+        output = json_fmt.format_actions(
+            filtered_actions, indent=not compact, network=network, console=console
+        )
     else:
-        output = markdown.format_actions(filtered_actions)
+        output = markdown.format_actions(filtered_actions, network, console)
 
     click.echo(output)
 
@@ -90,16 +202,38 @@ def actions(trace_file: Path, format: str, page: str | None, errors_only: bool):
 @click.option(
     "--format",
     "-f",
-    type=click.Choice(["json", "markdown"]),
+    type=click.Choice(["json", "markdown", "ndjson"]),
     default="json",
     show_default=True,
-    help="Output format",
+    help="Output format; ndjson writes one record per line as it is read",
 )
 @click.option("--page", "-p", help="Filter by pageId")
 @click.option("--level", help="Filter by message type (error, warning, log, etc.)")
-def console(trace_file: Path, format: str, page: str | None, level: str | None):
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Worker processes for decoding traces with several .trace/.network entries",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Write JSON without indentation",
+)
+def console(
+    trace_file: Path,
+    format: str,
+    page: str | None,
+    level: str | None,
+    jobs: int,
+    compact: bool,
+):
     """Extract console messages (errors, warnings, logs) with source locations."""
-    data = parse_trace_file(trace_file)
+    data = parse_trace_file(
+        trace_file, ["console_messages"], TraceCache.from_env(), jobs
+    )
 
     messages = data.console_messages
 
@@ -109,8 +243,12 @@ def console(trace_file: Path, format: str, page: str | None, level: str | None):
     if level:
         messages = [m for m in messages if m.message_type == level]
 
+    if format == "ndjson":
+        _echo_lines(ndjson_fmt.format_console(messages))
+        return
+
     if format == "json":
-        output = json_fmt.format_console(messages)
+        output = json_fmt.format_console(messages, indent=not compact)
     else:
         output = markdown.format_console(messages)
 
@@ -122,32 +260,199 @@ def console(trace_file: Path, format: str, page: str | None, level: str | None):
 @click.option(
     "--format",
     "-f",
-    type=click.Choice(["json", "markdown"]),
+    type=click.Choice(["json", "markdown", "ndjson"]),
     default="json",
     show_default=True,
-    help="Output format",
+    help="Output format; ndjson writes one record per line as it is read",
 )
 @click.option("--failed-only", is_flag=True, help="Only show failed requests")
+@click.option(
+    "--status",
+    "statuses",
+    multiple=True,
+    callback=_validate_statuses,
+    help="Only show these status codes or classes, e.g. 404 or 5xx (repeatable)",
+)
+@click.option(
+    "--method",
+    "methods",
+    multiple=True,
+    help="Only show requests with this HTTP method (repeatable)",
+)
+@click.option(
+    "--content-type", help="Only show responses whose content type contains this"
+)
+@click.option("--url-pattern", help="Only show URLs matching regex pattern")
 @click.option("--ignore-pattern", help="Exclude URLs matching regex pattern")
+@click.option(
+    "--bodies",
+    is_flag=True,
+    help="Include each shown request's response body, read from the trace on demand",
+)
+@click.option(
+    "--max-body-bytes",
+    type=click.IntRange(min=0),
+    default=DEFAULT_MAX_BODY_BYTES,
+    show_default=True,
+    help="Bytes of each response body to include (0 for all)",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Worker processes for decoding traces with several .trace/.network entries",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Write JSON without indentation",
+)
 def network(
-    trace_file: Path, format: str, failed_only: bool, ignore_pattern: str | None
+    trace_file: Path,
+    format: str,
+    failed_only: bool,
+    statuses: tuple[str, ...],
+    methods: tuple[str, ...],
+    content_type: str | None,
+    url_pattern: str | None,
+    ignore_pattern: str | None,
+    bodies: bool,
+    max_body_bytes: int,
+    jobs: int,
+    compact: bool,
 ):
     """Inspect network requests with status codes, timing, content types, and failure details."""
-    data = parse_trace_file(trace_file)
+    from playwright_trace_analyzer.extractors.network import (
+        NetworkRequestFilter,
+        iter_network_requests,
+        load_network_requests,
+    )
 
-    requests = data.network_requests
+    request_filter = NetworkRequestFilter(
+        failed_only=failed_only,
+        statuses=statuses,
+        methods=frozenset(m.upper() for m in methods),
+        content_type=content_type,
+        url_pattern=url_pattern,
+        ignore_pattern=ignore_pattern,
+    )
 
-    if failed_only:
-        requests = [r for r in requests if r.status >= 400 or r.failure_text]
+    if format == "ndjson":
+        # requests are written as each .network entry is read, and their bodies just before them
+        requests = iter_network_requests(
+            trace_file,
+            None if request_filter == NetworkRequestFilter() else request_filter,
+            TraceCache.from_env(),
+            jobs,
+        )
+        with zipfile.ZipFile(trace_file) as zf:
+            read_body = None
+            if bodies:
+                read_body = partial(
+                    read_response_body, zf, max_bytes=max_body_bytes or None
+                )
+            _echo_lines(ndjson_fmt.format_network(requests, read_body))
+        return
+
+    if request_filter == NetworkRequestFilter():
+        data = parse_trace_file(
+            trace_file, ["network_requests"], TraceCache.from_env(), jobs
+        )
+        requests = data.network_requests
+    else:
+        # filters are pushed into the reader, so rejected lines are never decoded or built
+        requests = load_network_requests(
+            trace_file, request_filter, TraceCache.from_env(), jobs
+        )
+
+    response_bodies = None
+    if bodies:
+        # only the shown requests' bodies are read, each up to the cap
+        with zipfile.ZipFile(trace_file) as zf:
+            response_bodies = [
+                read_response_body(zf, request, max_body_bytes or None)
+                for request in requests
+            ]
+
+    if format == "json":
+        output = json_fmt.format_network(
+            requests, indent=not compact, bodies=response_bodies
+        )
+    else:
+        output = markdown.format_network(requests, response_bodies)
 
+    click.echo(output)
+
+
+@click.command("network-stats")
+@click.argument("trace_file", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--format",
+    "-f",
+    type=click.Choice(["json", "markdown"]),
+    default="json",
+    show_default=True,
+    help="Output format",
+)
+@click.option(
+    "--sort",
+    type=click.Choice(["p50", "p95", "p99", "max", "count", "bytes"]),
+    default="p95",
+    show_default=True,
+    help="Order groups by this column, largest first",
+)
+@click.option(
+    "--limit",
+    "-n",
+    type=click.IntRange(min=0),
+    default=20,
+    show_default=True,
+    help="Number of groups to show (0 for all)",
+)
+@click.option("--ignore-pattern", help="Exclude URLs matching regex pattern")
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Worker processes for decoding traces with several .trace/.network entries",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Write JSON without indentation",
+)
+def network_stats(
+    trace_file: Path,
+    format: str,
+    sort: str,
+    limit: int,
+    ignore_pattern: str | None,
+    jobs: int,
+    compact: bool,
+):
+    """Summarize request latency (p50/p95/p99), counts, failures and bytes per endpoint, grouped by method, host, path template and content type."""
+    from playwright_trace_analyzer.extractors.network import NetworkRequestFilter
+    from playwright_trace_analyzer.network_stats import collect_network_stats
+
+    request_filter = None
     if ignore_pattern:
-        pattern = re.compile(ignore_pattern)
-        requests = [r for r in requests if not pattern.search(r.url)]
+        request_filter = NetworkRequestFilter(ignore_pattern=ignore_pattern)
+
+    stats = collect_network_stats(
+        trace_file, request_filter, TraceCache.from_env(), jobs
+    )
+    groups = stats.result(sort)
+    if limit > 0:
+        groups = groups[:limit]
 
     if format == "json":
-        output = json_fmt.format_network(requests)
+        output = json_fmt.format_network_stats(groups, indent=not compact)
     else:
-        output = markdown.format_network(requests)
+        output = markdown.format_network_stats(groups)
 
     click.echo(output)
 
@@ -174,6 +479,33 @@ def network(
     show_default=True,
     help="Maximum number of screenshots to extract (0 for all)",
 )
+@click.option(
+    "--max-fps",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Keep at most this many frames per second for each page, before any image is decoded",
+)
+@click.option(
+    "--min-interval-ms",
+    type=click.FloatRange(min=0),
+    help="Keep frames of each page at least this many milliseconds apart, before any image is decoded",
+)
+@click.option(
+    "--max-width",
+    type=click.IntRange(min=1),
+    help="Downscale screenshots wider than this many pixels",
+)
+@click.option(
+    "--format",
+    type=click.Choice(["jpeg", "webp"]),
+    help="Re-encode screenshots instead of writing the original JPEG bytes",
+)
+@click.option(
+    "--quality",
+    type=click.IntRange(min=1, max=100),
+    default=80,
+    show_default=True,
+    help="Encoder quality when re-encoding with --format or --max-width",
+)
 @click.option(
     "--dedupe-threshold",
     type=float,
@@ -181,22 +513,47 @@ def network(
     show_default=True,
     help="Fraction of pixels that must differ to keep a frame (0 to disable deduplication)",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Worker processes for decoding traces with several .trace/.network entries, and threads for deduplicating frames",
+)
 def screenshots(
     trace_file: Path,
     output_dir: Path,
     page: str | None,
     action_only: bool,
     limit: int,
+    max_fps: float | None,
+    min_interval_ms: float | None,
+    max_width: int | None,
+    format: str | None,
+    quality: int,
     dedupe_threshold: float,
+    jobs: int,
 ):
     """Extract screenshots embedded in the trace to a directory."""
     from playwright_trace_analyzer.extractors.screenshots import (
+        FrameEncoder,
+        FrameImageCache,
+        decimate_frames,
+        extract_frame_resources,
         filter_action_frames,
         build_screenshot_filename,
-        deduplicate_frames,
+        iter_deduplicated_frames,
     )
 
-    data = parse_trace_file(trace_file)
+    data = parse_trace_file(
+        trace_file,
+        ["screenshots", "metadata", "actions"]
+        if action_only
+        else ["screenshots", "metadata"],
+        TraceCache.from_env(),
+        jobs,
+    )
     frames = data.screenshots
 
     if page:
@@ -205,30 +562,55 @@ def screenshots(
     if action_only:
         frames = filter_action_frames(frames, data.actions)
 
+    # the stricter of the two rates wins when both are given
+    min_interval = max(1000 / max_fps if max_fps else 0, min_interval_ms or 0)
+    if min_interval > 0:
+        frames = decimate_frames(frames, min_interval)
+
     output_dir.mkdir(parents=True, exist_ok=True)
 
     with zipfile.ZipFile(trace_file) as zf:
         if 0 < dedupe_threshold < 1.0:
-            frames = deduplicate_frames(frames, zf, dedupe_threshold)
+            diffs = FrameDiffCache.from_env()
+            try:
+                # with a limit, dedupe from the end of the timeline and stop once enough frames are kept
+                # closing the generator settles its pending decodes before the diffs and archive are closed
+                with closing(
+                    iter_deduplicated_frames(
+                        frames,
+                        zf,
+                        dedupe_threshold,
+                        jobs,
+                        FrameImageCache(zf),
+                        diffs,
+                        reverse=limit > 0,
+                    )
+                ) as kept:
+                    frames = (
+                        list(islice(kept, limit))[::-1] if limit > 0 else list(kept)
+                    )
+            finally:
+                if diffs is not None:
+                    diffs.close()
 
         if limit > 0:
             frames = frames[-limit:]
 
-        resource_names = set(zf.namelist())
-        screenshot_count = 0
-
-        for frame in frames:
-            resource_path = f"resources/{frame.sha1}"
-
-            if resource_path in resource_names:
-                output_filename = build_screenshot_filename(
-                    frame, data.metadata.trace_start_time
-                )
-                output_path = output_dir / output_filename
-
-                with zf.open(resource_path) as src:
-                    output_path.write_bytes(src.read())
-                screenshot_count += 1
+        encoder = None
+        if format or max_width:
+            encoder = FrameEncoder(format or "jpeg", quality, max_width)
+
+        extension = encoder.image_format if encoder else "jpeg"
+        trace_start_time = data.metadata.trace_start_time
+        targets = [
+            (
+                frame.sha1,
+                output_dir
+                / build_screenshot_filename(frame, trace_start_time, extension),
+            )
+            for frame in frames
+        ]
+        screenshot_count = extract_frame_resources(zf, targets, encoder=encoder)
 
     click.echo(f"Extracted {screenshot_count} screenshots to {output_dir}")
 
@@ -243,12 +625,25 @@ def screenshots(
     show_default=True,
     help="Output format",
 )
-def metadata(trace_file: Path, format: str):
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Worker processes for decoding traces with several .trace/.network entries",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Write JSON without indentation",
+)
+def metadata(trace_file: Path, format: str, jobs: int, compact: bool):
     """View trace metadata including browser, platform, viewport, SDK language, and test duration."""
-    data = parse_trace_file(trace_file)
+    data = parse_trace_file(trace_file, ["metadata"], TraceCache.from_env(), jobs)
 
     if format == "json":
-        output = json_fmt.format_metadata(data.metadata)
+        output = json_fmt.format_metadata(data.metadata, indent=not compact)
     else:
         output = markdown.format_metadata(data.metadata)
 
@@ -259,6 +654,7 @@ cli.add_command(summary)
 cli.add_command(actions)
 cli.add_command(console)
 cli.add_command(network)
+cli.add_command(network_stats)
 cli.add_command(screenshots)
 cli.add_command(metadata)
 
@@ -1,53 +1,198 @@
+import bisect
+import math
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
 from playwright_trace_analyzer.models import Action, ActionError, LogMessage
-from playwright_trace_analyzer.parser import group_events_by_call_id
+from playwright_trace_analyzer.parser import EventDispatcher
 
 
-def extract_actions(events: list[dict]) -> list[Action]:
-    call_groups = group_events_by_call_id(events)
-    actions = []
-
-    for call_id, call_events in call_groups.items():
-        before_event = next((e for e in call_events if e.get("type") == "before"), None)
-        if not before_event:
-            continue
-
-        after_event = next((e for e in call_events if e.get("type") == "after"), None)
-        log_events = [e for e in call_events if e.get("type") == "log"]
-
-        params = before_event.get("params", {})
-        start_time = before_event.get("startTime", 0)
-        end_time = after_event.get("endTime") if after_event else None
-
-        error = None
-        if after_event and after_event.get("error"):
-            error_data = after_event["error"]
-            error = ActionError(
-                error=error_data.get("message", ""),
-                stack=error_data.get("stack"),
-            )
+@dataclass(slots=True)
+class _Call:
+    action: Action | None = None
+    after_seen: bool = False
+    end_time: float | None = None
+    error: ActionError | None = None
+    log_messages: list[LogMessage] = field(default_factory=list)
+
+
+class ActionExtractor:
+    """
+    Folds before/after/log events into actions as they arrive, keeping only the fields an `Action` needs rather
+    than the raw events (whose stacks and snapshots dominate their size).
+    """
+
+    event_types = frozenset({"before", "after", "log"})
+
+    def __init__(self):
+        self.calls: dict[str, _Call] = {}
+        self._actions: list[Action] | None = None
+
+    def handle(self, event: dict) -> None:
+        call_id = event.get("callId")
+        if not call_id:
+            return
+
+        call = self.calls.get(call_id)
+        if call is None:
+            call = self.calls[call_id] = _Call()
+
+        event_type = event["type"]
 
-        log_messages = [
-            LogMessage(
-                time=log_event.get("time", 0),
-                message=log_event.get("message", ""),
+        if event_type == "before":
+            if call.action is None:
+                call.action = _build_action(call_id, event)
+        elif event_type == "after":
+            if not call.after_seen:
+                call.after_seen = True
+                call.end_time = _optional_float(event.get("endTime"))
+                call.error = _build_error(event)
+        else:
+            call.log_messages.append(
+                LogMessage(
+                    time=float(event.get("time", 0)),
+                    message=event.get("message", ""),
+                )
             )
-            for log_event in log_events
+
+    def merge(self, other: "ActionExtractor") -> None:
+        for call_id, other_call in other.calls.items():
+            call = self.calls.get(call_id)
+            if call is None:
+                self.calls[call_id] = other_call
+                continue
+
+            call.action = call.action or other_call.action
+            if not call.after_seen and other_call.after_seen:
+                call.after_seen = True
+                call.end_time = other_call.end_time
+                call.error = other_call.error
+            call.log_messages.extend(other_call.log_messages)
+
+    def result(self) -> list[Action]:
+        if self._actions is not None:
+            return self._actions
+
+        actions = []
+
+        for call in self.calls.values():
+            if call.action is None:
+                continue
+
+            call.action.end_time = call.end_time
+            call.action.error = call.error
+            call.action.log_messages = call.log_messages
+            actions.append(call.action)
+
+        actions.sort(key=lambda a: a.start_time)
+        self._actions = actions
+        return actions
+
+
+def _build_action(call_id: str, before_event: dict) -> Action:
+    return Action(
+        call_id=call_id,
+        title=before_event.get("title"),
+        class_name=before_event.get("class", ""),
+        method=before_event.get("method", ""),
+        params=before_event.get("params", {}),
+        start_time=float(before_event.get("startTime", 0)),
+        page_id=before_event.get("pageId"),
+    )
+
+
+def _build_error(after_event: dict) -> ActionError | None:
+    error_data = after_event.get("error")
+    if not error_data:
+        return None
+
+    return ActionError(
+        error=error_data.get("message", ""),
+        stack=error_data.get("stack"),
+    )
+
+
+def _optional_float(value: float | None) -> float | None:
+    return None if value is None else float(value)
+
+
+def extract_actions(events: list[dict]) -> list[Action]:
+    extractor = ActionExtractor()
+    EventDispatcher([extractor]).run(events)
+    return extractor.result()
+
+
+class _ActionIntervals:
+    """
+    Actions sorted by start time, each linked to the closest earlier action that ends later. An action that ended
+    before some time rules out every action between it and its link too, so a lookup only visits actions that
+    enclose the one it lands on.
+    """
+
+    def __init__(self, actions: list[Action]):
+        # the sort is stable, so of the actions sharing a start time the last one in input order is innermost
+        self.actions = sorted(actions, key=lambda a: a.start_time)
+        self.starts = [a.start_time for a in self.actions]
+        # an unfinished action runs until the end of the trace
+        self.ends = [
+            math.inf if a.end_time is None else a.end_time for a in self.actions
         ]
 
-        actions.append(
-            Action(
-                call_id=call_id,
-                title=before_event.get("title"),
-                class_name=before_event.get("class", ""),
-                method=before_event.get("method", ""),
-                params=params,
-                start_time=start_time,
-                end_time=end_time,
-                page_id=before_event.get("pageId"),
-                error=error,
-                log_messages=log_messages,
-            )
-        )
+        self.outer: list[int] = []
+        stack: list[int] = []
+        for index, end in enumerate(self.ends):
+            while stack and self.ends[stack[-1]] <= end:
+                stack.pop()
+            self.outer.append(stack[-1] if stack else -1)
+            stack.append(index)
+
+    def enclosing(self, time: float) -> Action | None:
+        index = bisect.bisect_right(self.starts, time) - 1
+        while index >= 0:
+            if self.ends[index] >= time:
+                return self.actions[index]
+            index = self.outer[index]
+        return None
+
+
+class ActionIndex:
+    """Action `[start_time, end_time]` windows per page, for attributing timestamped records to actions."""
+
+    def __init__(self, actions: Iterable[Action]):
+        actions = list(actions)
+        by_page: dict[str | None, list[Action]] = defaultdict(list)
+        for action in actions:
+            by_page[action.page_id].append(action)
+
+        self._pages = {
+            page_id: _ActionIntervals(page_actions)
+            for page_id, page_actions in by_page.items()
+        }
+        self._all = _ActionIntervals(actions)
+
+    def enclosing(self, page_id: str | None, time: float) -> Action | None:
+        """The latest-starting action of `page_id` running at `time`; any page's when `page_id` is None."""
+        intervals = self._all if page_id is None else self._pages.get(page_id)
+        if intervals is None:
+            return None
+        return intervals.enclosing(time)
+
+    def attribute[ItemT](
+        self,
+        items: Iterable[ItemT],
+        locate: Callable[[ItemT], tuple[str | None, float | None]],
+    ) -> dict[str, list[ItemT]]:
+        """Group `items` by the call id of their enclosing action; `locate` gives each item's page and time."""
+        by_action: dict[str, list[ItemT]] = defaultdict(list)
+
+        for item in items:
+            page_id, time = locate(item)
+            if time is None:
+                continue
+
+            action = self.enclosing(page_id, time)
+            if action is not None:
+                by_action[action.call_id].append(item)
 
-    actions.sort(key=lambda a: a.start_time)
-    return actions
+        return dict(by_action)
@@ -1,27 +1,43 @@
 from playwright_trace_analyzer.models import ConsoleMessage, SourceLocation
+from playwright_trace_analyzer.parser import EventDispatcher
 
 
-def extract_console_messages(events: list[dict]) -> list[ConsoleMessage]:
-    messages = []
-
-    for event in events:
-        if event.get("type") == "console":
-            location_data = event.get("location", {})
-            location = SourceLocation(
-                url=location_data.get("url", ""),
-                line_number=location_data.get("lineNumber"),
-                column_number=location_data.get("columnNumber"),
-            )
+class ConsoleExtractor:
+    event_types = frozenset({"console"})
+
+    def __init__(self):
+        self.messages: list[ConsoleMessage] = []
+
+    def handle(self, event: dict) -> None:
+        location_data = event.get("location", {})
+        line_number = location_data.get("lineNumber")
+        column_number = location_data.get("columnNumber")
+        location = SourceLocation(
+            url=location_data.get("url", ""),
+            line_number=int(line_number) if line_number is not None else None,
+            column_number=int(column_number) if column_number is not None else None,
+        )
 
-            messages.append(
-                ConsoleMessage(
-                    time=event.get("timestamp", 0),
-                    page_id=event.get("pageId"),
-                    message_type=event.get("messageType", "log"),
-                    text=event.get("text", ""),
-                    location=location,
-                )
+        self.messages.append(
+            ConsoleMessage(
+                # console events carry `time`, like log events
+                time=float(event.get("time", event.get("timestamp", 0))),
+                page_id=event.get("pageId"),
+                message_type=event.get("messageType", "log"),
+                text=event.get("text", ""),
+                location=location,
             )
+        )
 
-    messages.sort(key=lambda m: m.time)
-    return messages
+    def merge(self, other: "ConsoleExtractor") -> None:
+        self.messages.extend(other.messages)
+
+    def result(self) -> list[ConsoleMessage]:
+        self.messages.sort(key=lambda m: m.time)
+        return self.messages
+
+
+def extract_console_messages(events: list[dict]) -> list[ConsoleMessage]:
+    extractor = ConsoleExtractor()
+    EventDispatcher([extractor]).run(events)
+    return extractor.result()
@@ -1,33 +1,41 @@
 from playwright_trace_analyzer.models import TraceError, Action
+from playwright_trace_analyzer.parser import EventDispatcher
+from playwright_trace_analyzer.extractors.actions import ActionExtractor
 
 
-def extract_errors(events: list[dict], actions: list[Action]) -> list[TraceError]:
-    errors = []
+class ErrorExtractor:
+    event_types = frozenset({"error", "page-error"})
 
-    for event in events:
-        event_type = event.get("type")
+    def __init__(self, actions: ActionExtractor | None = None):
+        self.errors: list[TraceError] = []
+        self.actions = actions
 
-        if event_type == "error":
-            errors.append(
-                TraceError(
-                    time=event.get("timestamp", 0),
-                    error_type="error",
-                    message=event.get("error", {}).get("message", ""),
-                    stack=event.get("error", {}).get("stack"),
-                    page_id=event.get("pageId"),
-                )
-            )
-        elif event_type == "page-error":
-            page_error = event.get("error", {})
-            errors.append(
-                TraceError(
-                    time=event.get("timestamp", 0),
-                    error_type="page-error",
-                    message=page_error.get("message", ""),
-                    stack=page_error.get("stack"),
-                    page_id=event.get("pageId"),
-                )
+    def handle(self, event: dict) -> None:
+        error = event.get("error", {})
+        self.errors.append(
+            TraceError(
+                time=float(event.get("timestamp", 0)),
+                error_type=event["type"],
+                message=error.get("message", ""),
+                stack=error.get("stack"),
+                page_id=event.get("pageId"),
             )
+        )
+
+    def merge(self, other: "ErrorExtractor") -> None:
+        self.errors.extend(other.errors)
+
+    def result(self) -> list[TraceError]:
+        if self.actions is None:
+            return self.errors
+
+        return merge_action_errors(self.errors, self.actions.result())
+
+
+def merge_action_errors(
+    errors: list[TraceError], actions: list[Action]
+) -> list[TraceError]:
+    errors = list(errors)
 
     for action in actions:
         if action.error:
@@ -43,3 +51,9 @@ def extract_errors(events: list[dict], actions: list[Action]) -> list[TraceError
 
     errors.sort(key=lambda e: e.time)
     return errors
+
+
+def extract_errors(events: list[dict], actions: list[Action]) -> list[TraceError]:
+    extractor = ErrorExtractor()
+    EventDispatcher([extractor]).run(events)
+    return merge_action_errors(extractor.result(), actions)
@@ -1,9 +1,68 @@
+from collections.abc import Callable
+
 from playwright_trace_analyzer.models import TraceMetadata, Size
+from playwright_trace_analyzer.parser import EventDispatcher
+
+
+class MetadataExtractor:
+    event_types = None
+
+    def __init__(self):
+        self.context_event: dict | None = None
+        self.min_start_time: float | None = None
+        self.min_timestamp: float | None = None
+        self.max_timestamp: float | None = None
+
+    def handle(self, event: dict) -> None:
+        if self.context_event is None and event.get("type") == "context-options":
+            self.context_event = event
+
+        if (start_time := event.get("startTime")) and (
+            self.min_start_time is None or start_time < self.min_start_time
+        ):
+            self.min_start_time = start_time
+
+        if timestamp := event.get("timestamp"):
+            if self.min_timestamp is None or timestamp < self.min_timestamp:
+                self.min_timestamp = timestamp
+            if self.max_timestamp is None or timestamp > self.max_timestamp:
+                self.max_timestamp = timestamp
+
+    def merge(self, other: "MetadataExtractor") -> None:
+        self.context_event = self.context_event or other.context_event
+        self.min_start_time = _merge_bound(
+            self.min_start_time, other.min_start_time, min
+        )
+        self.min_timestamp = _merge_bound(self.min_timestamp, other.min_timestamp, min)
+        self.max_timestamp = _merge_bound(self.max_timestamp, other.max_timestamp, max)
+
+    def result(self) -> TraceMetadata:
+        return _build_metadata(
+            self.context_event or {},
+            self.min_start_time or 0,
+            (self.max_timestamp or 0) - (self.min_timestamp or 0),
+        )
+
+
+def _merge_bound(
+    a: float | None, b: float | None, pick: Callable[[float, float], float]
+) -> float | None:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return pick(a, b)
 
 
 def extract_metadata(events: list[dict]) -> TraceMetadata:
-    context_event = next((e for e in events if e.get("type") == "context-options"), {})
+    extractor = MetadataExtractor()
+    EventDispatcher([extractor]).run(events)
+    return extractor.result()
+
 
+def _build_metadata(
+    context_event: dict, min_start_time: float, duration_ms: float
+) -> TraceMetadata:
     options = context_event.get("contextOptions", {})
     browser = context_event.get("browser", {})
     platform_data = context_event.get("platform", {})
@@ -11,17 +70,7 @@ def extract_metadata(events: list[dict]) -> TraceMetadata:
     trace_start_time = context_event.get("monotonicTime", 0.0)
 
     if not trace_start_time:
-        trace_start_time = min(
-            (e.get("startTime", 0) for e in events if e.get("startTime")), default=0
-        )
-
-    start_time = min(
-        (e.get("timestamp", 0) for e in events if e.get("timestamp")), default=0
-    )
-    end_time = max(
-        (e.get("timestamp", 0) for e in events if e.get("timestamp")), default=0
-    )
-    duration_ms = end_time - start_time
+        trace_start_time = min_start_time
 
     viewport_data = options.get("viewport")
     viewport = Size(**viewport_data) if viewport_data else None
@@ -1,61 +1,278 @@
-import json
+import re
 import zipfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
 
+from playwright_trace_analyzer.cache import TraceCache
 from playwright_trace_analyzer.models import NetworkRequest
+from playwright_trace_analyzer.ndjson import (
+    decode_lines,
+    iter_line_batches,
+    iter_line_chunks,
+    lines_matching,
+)
+from playwright_trace_analyzer.parser import map_entries
+
+# a status filter is an exact code such as 404 or a class such as 4xx
+STATUS_SPEC_PATTERN = re.compile(r"[1-5](?:\d\d|xx)")
+
+# bytes JSON would escape inside a string, which a raw byte search can't see through
+_JSON_ESCAPED = re.compile(r'["\\\x00-\x1f]|[^\x00-\x7f]')
+
+
+@dataclass(frozen=True)
+class NetworkRequestFilter:
+    """
+    Picklable request predicates, checked while reading `.network` entries so rejected rows are never built.
+
+    `select_lines` is a conservative byte-level search run before any line is decoded: it only drops lines that
+    cannot match. `__call__` is the exact check on the decoded fields.
+    """
+
+    failed_only: bool = False
+    statuses: tuple[str, ...] = ()
+    methods: frozenset[str] = frozenset()
+    content_type: str | None = None
+    url_pattern: str | None = None
+    ignore_pattern: str | None = None
+
+    def __post_init__(self):
+        for spec in self.statuses:
+            assert STATUS_SPEC_PATTERN.fullmatch(spec), f"invalid status filter: {spec}"
+
+    def __call__(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        failure_text: str | None,
+        content_type: str | None,
+    ) -> bool:
+        if self.failed_only and not (status >= 400 or failure_text):
+            return False
+
+        if self.statuses and not any(
+            _status_matches(spec, status) for spec in self.statuses
+        ):
+            return False
+
+        if self.methods and method.upper() not in self.methods:
+            return False
+
+        if self.content_type and (
+            content_type is None
+            or self.content_type.lower() not in content_type.lower()
+        ):
+            return False
+
+        if self.url_pattern and not re.search(self.url_pattern, url):
+            return False
+
+        return not (self.ignore_pattern and re.search(self.ignore_pattern, url))
+
+    def accepts(self, request: NetworkRequest) -> bool:
+        return self(
+            request.method,
+            request.url,
+            request.status,
+            request.failure_text,
+            request.content_type,
+        )
+
+    def select_lines(self, chunk: bytes) -> list[bytes]:
+        """The lines of `chunk` that may match; the first pattern scans the whole chunk, the rest each candidate."""
+        if not self._line_patterns:
+            return chunk.split(b"\n")
+
+        anchor, *rest = self._line_patterns
+        return [
+            line
+            for line in lines_matching(chunk, anchor)
+            if all(pattern.search(line) for pattern in rest)
+        ]
+
+    @cached_property
+    def _line_patterns(self) -> list[re.Pattern[bytes]]:
+        """Patterns every matching line must contain; URL regexes need the decoded URL, so they have none."""
+        patterns = []
+
+        if self.failed_only:
+            patterns.append(
+                re.compile(
+                    rb'"_failureText"\s*:\s*"|"status"\s*:\s*(?:[4-9]\d\d|\d{4})'
+                )
+            )
+
+        if self.statuses:
+            codes = b"|".join(
+                spec.replace("xx", r"\d\d").encode() for spec in self.statuses
+            )
+            patterns.append(re.compile(rb'"status"\s*:\s*(?:' + codes + rb")(?!\d)"))
+
+        # a request without a method counts as GET, so only other methods are guaranteed to appear in the line
+        if self.methods and "GET" not in self.methods:
+            names = b"|".join(re.escape(m.encode()) for m in sorted(self.methods))
+            patterns.append(
+                re.compile(rb'"method"\s*:\s*"(?:' + names + rb')"', re.IGNORECASE)
+            )
+
+        if self.content_type and not _JSON_ESCAPED.search(self.content_type):
+            patterns.append(
+                re.compile(re.escape(self.content_type.encode()), re.IGNORECASE)
+            )
+
+        return patterns
+
+
+def _status_matches(spec: str, status: int) -> bool:
+    if spec.endswith("xx"):
+        return status // 100 == int(spec[0])
+    return status == int(spec)
 
 
 def extract_network_requests(
-    zf: zipfile.ZipFile, _events: list[dict]
+    zf: zipfile.ZipFile,
+    _events: list[dict] | None = None,
+    jobs: int = 1,
+    request_filter: NetworkRequestFilter | None = None,
 ) -> list[NetworkRequest]:
     requests = []
 
-    for name in zf.namelist():
-        if name.endswith(".network"):
-            with zf.open(name) as f:
-                for line in f:
-                    line = line.decode("utf-8").strip()
-                    if not line:
-                        continue
-
-                    entry = json.loads(line)
-
-                    if entry.get("type") != "resource-snapshot":
-                        continue
-
-                    snapshot = entry.get("snapshot", {})
-                    request = snapshot.get("request", {})
-                    response = snapshot.get("response", {})
-                    timings = snapshot.get("timings", {})
-
-                    status = response.get("status", 0)
-                    duration = sum(
-                        timings.get(k, 0)
-                        for k in ["dns", "connect", "ssl", "send", "wait", "receive"]
-                    )
-
-                    response_size = 0
-                    content = response.get("content", {})
-                    if content:
-                        response_size = content.get("size", 0)
-
-                    content_type = None
-                    for header in response.get("headers", []):
-                        if header.get("name", "").lower() == "content-type":
-                            content_type = header.get("value")
-                            break
-
-                    requests.append(
-                        NetworkRequest(
-                            method=request.get("method", "GET"),
-                            url=request.get("url", ""),
-                            status=status,
-                            status_text=response.get("statusText", ""),
-                            failure_text=snapshot.get("_failureText"),
-                            was_aborted=snapshot.get("_wasAborted", False),
-                            duration_ms=duration,
-                            response_size=response_size,
-                            content_type=content_type,
-                        )
-                    )
+    for entry_requests in map_entries(
+        zf, ".network", _read_network_entry, request_filter, jobs=jobs
+    ):
+        requests.extend(entry_requests)
 
     return requests
+
+
+def load_network_requests(
+    trace_path: Path,
+    request_filter: NetworkRequestFilter,
+    cache: TraceCache | None = None,
+    jobs: int = 1,
+) -> list[NetworkRequest]:
+    """
+    The requests passing `request_filter`. An already cached `network_requests` section is filtered in memory;
+    otherwise the filter is pushed into the reader and the partial result is not cached.
+    """
+    if cache is not None:
+        cached = cache.get(cache.trace_key(trace_path), "network_requests")
+        if isinstance(cached, list):
+            return [request for request in cached if request_filter.accepts(request)]
+
+    with zipfile.ZipFile(trace_path) as zf:
+        return extract_network_requests(zf, jobs=jobs, request_filter=request_filter)
+
+
+def iter_network_requests(
+    trace_path: Path,
+    request_filter: NetworkRequestFilter | None = None,
+    cache: TraceCache | None = None,
+    jobs: int = 1,
+) -> Iterator[NetworkRequest]:
+    """
+    Stream the requests passing `request_filter`, in the same order as `load_network_requests`. An already cached
+    `network_requests` section is filtered as it is read; otherwise each `.network` entry is read as it is consumed
+    (whole entries at a time with `jobs` > 1) and nothing is cached.
+    """
+    if cache is not None:
+        cached = cache.get(cache.trace_key(trace_path), "network_requests")
+        if isinstance(cached, list):
+            for request in cached:
+                if request_filter is None or request_filter.accepts(request):
+                    yield request
+            return
+
+    with zipfile.ZipFile(trace_path) as zf:
+        if jobs > 1:
+            yield from extract_network_requests(
+                zf, jobs=jobs, request_filter=request_filter
+            )
+            return
+
+        for name in zf.namelist():
+            if name.endswith(".network"):
+                yield from iter_network_entry(zf, name, request_filter)
+
+
+def _read_network_entry(
+    zf: zipfile.ZipFile, name: str, request_filter: NetworkRequestFilter | None = None
+) -> list[NetworkRequest]:
+    return list(iter_network_entry(zf, name, request_filter))
+
+
+def iter_network_entry(
+    zf: zipfile.ZipFile, name: str, request_filter: NetworkRequestFilter | None = None
+) -> Iterator[NetworkRequest]:
+    """Stream the requests of one `.network` entry, holding one chunk of lines at a time."""
+    with zf.open(name) as f:
+        if request_filter is None:
+            batches = iter_line_batches(f)
+        else:
+            batches = map(request_filter.select_lines, iter_line_chunks(f))
+
+        for lines in batches:
+            for entry in decode_lines(lines):
+                if entry.get("type") != "resource-snapshot":
+                    continue
+
+                request = _build_network_request(
+                    entry.get("snapshot", {}), request_filter
+                )
+                if request is not None:
+                    yield request
+
+
+def _build_network_request(
+    snapshot: dict, request_filter: NetworkRequestFilter | None
+) -> NetworkRequest | None:
+    request = snapshot.get("request", {})
+    response = snapshot.get("response", {})
+
+    method = request.get("method", "GET")
+    url = request.get("url", "")
+    status = response.get("status", 0)
+    failure_text = snapshot.get("_failureText")
+
+    content_type = None
+    for header in response.get("headers", []):
+        if header.get("name", "").lower() == "content-type":
+            content_type = header.get("value")
+            break
+
+    if request_filter is not None and not request_filter(
+        method, url, status, failure_text, content_type
+    ):
+        return None
+
+    timings = snapshot.get("timings", {})
+    duration = sum(
+        timings.get(k, 0) for k in ["dns", "connect", "ssl", "send", "wait", "receive"]
+    )
+
+    response_size = 0
+    content = response.get("content", {})
+    if content:
+        response_size = content.get("size", 0)
+
+    return NetworkRequest(
+        method=method,
+        url=url,
+        status=status,
+        status_text=response.get("statusText", ""),
+        failure_text=failure_text,
+        was_aborted=snapshot.get("_wasAborted", False),
+        duration_ms=float(duration),
+        response_size=response_size,
+        content_type=content_type,
+        page_id=snapshot.get("pageref"),
+        start_time=_optional_float(snapshot.get("_monotonicTime")),
+        body_sha1=content.get("_sha1"),
+    )
+
+
+def _optional_float(value: float | None) -> float | None:
+    return None if value is None else float(value)
@@ -1,108 +1,640 @@
+import bisect
 import io
+import math
+import os
+import shutil
+import struct
+import threading
 import zipfile
+from collections import OrderedDict, defaultdict
+from collections.abc import Generator, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
 
-from PIL import Image
-from pixelmatch.contrib.PIL import pixelmatch
+from PIL import Image, UnidentifiedImageError
+from structlog_config import get_logger
 
+from playwright_trace_analyzer.cache import FrameDiffCache
+from playwright_trace_analyzer.image_diff import count_different_pixels
 from playwright_trace_analyzer.models import ScreencastFrame, Action
+from playwright_trace_analyzer.parser import EventDispatcher
 
+log = get_logger()
 
-def extract_screenshots(events: list[dict]) -> list[ScreencastFrame]:
-    frames = []
-
-    for event in events:
-        if event.get("type") == "screencast-frame":
-            frames.append(
-                ScreencastFrame(
-                    timestamp=event.get("timestamp", 0),
-                    page_id=event.get("pageId", ""),
-                    sha1=event.get("sha1", ""),
-                    width=event.get("width", 0),
-                    height=event.get("height", 0),
-                )
+
+class ScreencastExtractor:
+    event_types = frozenset({"screencast-frame"})
+
+    def __init__(self):
+        self.frames: list[ScreencastFrame] = []
+
+    def handle(self, event: dict) -> None:
+        self.frames.append(
+            ScreencastFrame(
+                timestamp=float(event.get("timestamp", 0)),
+                page_id=event.get("pageId", ""),
+                sha1=event.get("sha1", ""),
+                width=event.get("width", 0),
+                height=event.get("height", 0),
             )
+        )
+
+    def merge(self, other: "ScreencastExtractor") -> None:
+        self.frames.extend(other.frames)
+
+    def result(self) -> list[ScreencastFrame]:
+        self.frames.sort(key=lambda f: f.timestamp)
+        return self.frames
+
+
+def extract_screenshots(events: list[dict]) -> list[ScreencastFrame]:
+    extractor = ScreencastExtractor()
+    EventDispatcher([extractor]).run(events)
+    return extractor.result()
+
+
+class FrameIndex:
+    """Screencast frames grouped by page and sorted by timestamp, for binary-searched time-range queries."""
+
+    def __init__(self, frames: Iterable[ScreencastFrame]):
+        by_page: dict[str, list[ScreencastFrame]] = defaultdict(list)
+        for frame in frames:
+            by_page[frame.page_id].append(frame)
+
+        # the sort is stable, so frames sharing a timestamp keep their input order
+        self._frames: dict[str | None, list[ScreencastFrame]] = {
+            page_id: sorted(page_frames, key=lambda f: f.timestamp)
+            for page_id, page_frames in by_page.items()
+        }
+        self._timestamps: dict[str | None, list[float]] = {
+            page_id: [f.timestamp for f in page_frames]
+            for page_id, page_frames in self._frames.items()
+        }
+
+    def between(
+        self, page_id: str | None, start: float, end: float
+    ) -> list[ScreencastFrame]:
+        """Frames of `page_id` with `start <= timestamp <= end`."""
+        timestamps = self._timestamps.get(page_id)
+        if not timestamps:
+            return []
 
-    frames.sort(key=lambda f: f.timestamp)
-    return frames
+        low = bisect.bisect_left(timestamps, start)
+        high = bisect.bisect_right(timestamps, end)
+        return self._frames[page_id][low:high]
+
+    def last_between(
+        self, page_id: str | None, start: float, end: float
+    ) -> ScreencastFrame | None:
+        """The latest frame of `page_id` in `[start, end]`; the first one in input order when several share it."""
+        timestamps = self._timestamps.get(page_id)
+        if not timestamps:
+            return None
+
+        last = bisect.bisect_right(timestamps, end) - 1
+        if last < 0 or timestamps[last] < start:
+            return None
+
+        return self._frames[page_id][bisect.bisect_left(timestamps, timestamps[last])]
 
 
 def filter_action_frames(
     frames: list[ScreencastFrame], actions: list[Action]
 ) -> list[ScreencastFrame]:
+    index = FrameIndex(frames)
     best_per_action: dict[str, ScreencastFrame] = {}
 
     for action in actions:
         if action.end_time is None:
             continue
 
-        for frame in frames:
-            if action.page_id != frame.page_id:
-                continue
-
-            if not (action.start_time <= frame.timestamp <= action.end_time):
-                continue
+        frame = index.last_between(action.page_id, action.start_time, action.end_time)
+        if frame is None:
+            continue
 
-            existing = best_per_action.get(action.call_id)
-            if existing is None or frame.timestamp > existing.timestamp:
-                best_per_action[action.call_id] = frame
+        existing = best_per_action.get(action.call_id)
+        if existing is None or frame.timestamp > existing.timestamp:
+            best_per_action[action.call_id] = frame
 
     result = list(best_per_action.values())
     result.sort(key=lambda f: f.timestamp)
     return result
 
 
-def build_screenshot_filename(frame: ScreencastFrame, trace_start_time: float) -> str:
+def decimate_frames(
+    frames: list[ScreencastFrame], min_interval_ms: float
+) -> list[ScreencastFrame]:
+    """Keep each page's frames at least `min_interval_ms` apart, judged on timestamps alone so nothing is decoded."""
+    last_kept: dict[str, float] = {}
+    result = []
+
+    for frame in frames:
+        previous = last_kept.get(frame.page_id)
+        if previous is not None and frame.timestamp - previous < min_interval_ms:
+            continue
+
+        last_kept[frame.page_id] = frame.timestamp
+        result.append(frame)
+
+    return result
+
+
+def build_screenshot_filename(
+    frame: ScreencastFrame, trace_start_time: float, extension: str = "jpeg"
+) -> str:
     relative_ms = int(frame.timestamp - trace_start_time)
-    return f"{relative_ms}ms.jpeg"
+    return f"{relative_ms}ms.{extension}"
 
 
-def _load_image(zf: zipfile.ZipFile, sha1: str) -> Image.Image:
-    resource_path = f"resources/{sha1}"
-    with zf.open(resource_path) as f:
-        img = Image.open(io.BytesIO(f.read()))
-        return img.convert("RGBA")
+@dataclass(frozen=True)
+class FrameEncoder:
+    """Re-encodes frame resources, optionally downscaled to `max_width`, instead of copying the original JPEG."""
 
+    image_format: str = "jpeg"
+    quality: int = 80
+    max_width: int | None = None
 
-def _images_are_similar(
-    img_a: Image.Image, img_b: Image.Image, threshold: float
+    def encode(self, data: bytes) -> bytes:
+        img = Image.open(io.BytesIO(data))
+
+        if self.max_width and img.width > self.max_width:
+            # thumbnail drafts JPEGs at a reduced scale first, so the full-resolution image is never decoded
+            img.thumbnail((self.max_width, img.height))
+
+        buffer = io.BytesIO()
+        img.convert("RGB").save(buffer, format=self.image_format, quality=self.quality)
+        return buffer.getvalue()
+
+
+# zip local file header: signature, versions, flags, method, times, crc, sizes, then name and extra lengths
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_FILE_HEADER_SIGNATURE = b"PK\x03\x04"
+
+# resources written at once; copies are I/O-bound and Pillow releases the GIL while re-encoding
+EXTRACT_WORKERS = 4
+
+EXTRACT_CHUNK_SIZE = 1024 * 1024
+
+
+def resource_info(zf: zipfile.ZipFile, sha1: str) -> zipfile.ZipInfo | None:
+    """The archive entry holding a frame's image, looked up in the archive's own index."""
+    try:
+        return zf.getinfo(f"resources/{sha1}")
+    except KeyError:
+        return None
+
+
+def extract_frame_resources(
+    zf: zipfile.ZipFile,
+    targets: Iterable[tuple[str, Path]],
+    workers: int = EXTRACT_WORKERS,
+    encoder: FrameEncoder | None = None,
+) -> int:
+    """
+    Write each `(sha1, path)` resource to disk, returning how many targets had a resource. With an `encoder`,
+    resources are re-encoded rather than copied byte for byte.
+
+    Writes are spread over a thread pool, one sha1 per task: its first path is written and any other paths are
+    copied from it. When several targets share a path the last one wins, as with sequential writes.
+    """
+    latest: dict[Path, str] = {}
+    found = 0
+    for sha1, path in targets:
+        if resource_info(zf, sha1) is not None:
+            latest[path] = sha1
+            found += 1
+
+    paths_by_sha1: dict[str, list[Path]] = defaultdict(list)
+    for path, sha1 in latest.items():
+        paths_by_sha1[sha1].append(path)
+
+    assert zf.filename is not None, (
+        "resources can only be extracted from an archive on disk"
+    )
+    archive_fd = os.open(zf.filename, os.O_RDONLY)
+    try:
+        with ThreadPoolExecutor(max(1, min(workers, len(paths_by_sha1)))) as pool:
+            futures = [
+                pool.submit(_extract_resource, zf, archive_fd, sha1, paths, encoder)
+                for sha1, paths in paths_by_sha1.items()
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        os.close(archive_fd)
+
+    return found
+
+
+def _extract_resource(
+    zf: zipfile.ZipFile,
+    archive_fd: int,
+    sha1: str,
+    paths: list[Path],
+    encoder: FrameEncoder | None,
+) -> None:
+    first, *copies = paths
+    info = zf.getinfo(f"resources/{sha1}")
+
+    if encoder is not None:
+        data = zf.read(info)
+        try:
+            data = encoder.encode(data)
+        except (OSError, UnidentifiedImageError):
+            # like the dedupe, a frame Pillow can't decode is kept, here as its stored bytes
+            log.debug("frame resource not re-encoded", sha1=sha1)
+        first.write_bytes(data)
+    else:
+        with open(first, "wb") as dst:
+            if not _copy_stored_entry(zf, archive_fd, info, dst.fileno()):
+                with zf.open(info) as src:
+                    shutil.copyfileobj(src, dst, EXTRACT_CHUNK_SIZE)
+
+    for path in copies:
+        shutil.copyfile(first, path)
+
+
+def _copy_stored_entry(
+    zf: zipfile.ZipFile, archive_fd: int, info: zipfile.ZipInfo, dst_fd: int
 ) -> bool:
-    if img_a.size != img_b.size:
+    """
+    Copy an uncompressed entry's bytes straight from the archive file in the kernel. Returns False when the entry
+    is compressed or encrypted, or the platform can't copy between files, so the caller streams it instead.
+    """
+    if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+        return False
+    if not hasattr(os, "copy_file_range"):
+        return False
+
+    # the data follows the local header, whose name and extra field lengths may differ from the central directory
+    header = os.pread(archive_fd, _LOCAL_HEADER_SIZE, info.header_offset)
+    if len(header) < _LOCAL_HEADER_SIZE or header[:4] != _LOCAL_FILE_HEADER_SIGNATURE:
         return False
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    offset = info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length
+
+    remaining = info.file_size
+    try:
+        while remaining:
+            copied = os.copy_file_range(archive_fd, dst_fd, remaining, offset, None)
+            if not copied:
+                break
+            offset += copied
+            remaining -= copied
+    except OSError:
+        # e.g. EXDEV or ENOSYS
+        pass
+
+    if not remaining:
+        return True
+
+    # drop any partial copy so the caller can stream the entry instead
+    os.ftruncate(dst_fd, 0)
+    os.lseek(dst_fd, 0, os.SEEK_SET)
+    return False
+
+
+# frames are first compared at 1/DRAFT_SCALE resolution, which JPEG can decode without a full decode
+DRAFT_SCALE = 2
+
+# a reduced-resolution mismatch fraction this many times below or above the threshold settles a pair without a
+# full-resolution diff; measured reduced/full ratios on text-heavy pages stay well within it
+PREFILTER_MARGIN = 4
+
+# frames decoded and compared ahead of the one being decided, per dedupe thread
+DEDUPE_LOOKAHEAD_PER_JOB = 4
 
+# decoded frames kept per run; a 1080p frame holds about 10 MB once its full-resolution image is decoded
+FRAME_CACHE_SIZE = 32
+
+# below this width a reduced-resolution frame loses too much detail to be trusted
+PREFILTER_MIN_WIDTH = 640
+
+
+class FrameImage:
+    """A screencast frame decoded at reduced resolution, with the full-resolution image decoded on first use."""
+
+    def __init__(self, zf: zipfile.ZipFile, sha1: str):
+        self.sha1 = sha1
+        with zf.open(f"resources/{sha1}") as f:
+            self._data = f.read()
+
+        img = Image.open(io.BytesIO(self._data))
+        self.size = img.size
+        self._image: Image.Image | None = None
+        self.thumbnail: Image.Image | None = None
+
+        if img.width >= PREFILTER_MIN_WIDTH:
+            target = (img.width // DRAFT_SCALE, img.height // DRAFT_SCALE)
+            # draft only applies to JPEG; anything else is reduced after a full decode
+            if img.draft("RGB", target) is None:
+                img = img.reduce(DRAFT_SCALE)
+            self.thumbnail = img.convert("RGBA")
+        else:
+            self._image = img.convert("RGBA")
+
+    @property
+    def image(self) -> Image.Image:
+        if self._image is None:
+            self._image = Image.open(io.BytesIO(self._data)).convert("RGBA")
+        return self._image
+
+
+class FrameImageCache:
+    """
+    Bounded LRU of decoded frames keyed by sha1, shared by every image operation in a run. Playwright repeats a
+    sha1 for consecutive frames of a static page, so each resource is decoded once while it stays in use.
+    """
+
+    def __init__(self, zf: zipfile.ZipFile, maxsize: int = FRAME_CACHE_SIZE):
+        self._zf = zf
+        self._maxsize = maxsize
+        self._frames: OrderedDict[str, FrameImage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sha1: str) -> FrameImage:
+        with self._lock:
+            frame = self._frames.get(sha1)
+            if frame is not None:
+                self._frames.move_to_end(sha1)
+                return frame
+
+        # decode outside the lock so dedupe threads can decode different frames at once
+        frame = FrameImage(self._zf, sha1)
+
+        with self._lock:
+            self._frames[sha1] = frame
+            self._frames.move_to_end(sha1)
+            while len(self._frames) > self._maxsize:
+                self._frames.popitem(last=False)
+
+        return frame
+
+
+@dataclass(frozen=True)
+class FrameDiff:
+    """Mismatch fractions of a frame pair: `thumbnail` on the reduced-resolution frames, `full` at full resolution."""
+
+    thumbnail: float | None = None
+    full: float | None = None
+
+    def similar(self, threshold: float) -> bool | None:
+        """Whether the pair is within `threshold`, or None when the known fractions can't tell."""
+        if self.full is not None:
+            return self.full <= threshold
+
+        # clearly similar or clearly different thumbnails settle a pair; only ambiguous pairs need a full diff
+        if self.thumbnail is not None:
+            if self.thumbnail <= threshold / PREFILTER_MARGIN:
+                return True
+            if self.thumbnail >= threshold * PREFILTER_MARGIN:
+                return False
+
+        return None
+
+
+# a pair nothing is known about yet
+_NO_DIFF = FrameDiff()
+
+
+def _mismatch_fraction(img_a: Image.Image, img_b: Image.Image) -> float:
     width, height = img_a.size
-    total_pixels = width * height
-    diff_count = pixelmatch(img_a, img_b)
-    diff_fraction = diff_count / total_pixels
+    return count_different_pixels(img_a, img_b) / (width * height)
+
+
+def _diff_frames(
+    a: FrameImage, b: FrameImage, threshold: float, known: FrameDiff = _NO_DIFF
+) -> FrameDiff:
+    """Measure as much of the pair's diff as `threshold` needs, on top of what is already `known`."""
+    if a.size != b.size:
+        return FrameDiff(full=math.inf)
+
+    diff = known
+    if (
+        diff.thumbnail is None
+        and a.thumbnail is not None
+        and b.thumbnail is not None
+        and a.thumbnail.size == b.thumbnail.size
+    ):
+        diff = FrameDiff(thumbnail=_mismatch_fraction(a.thumbnail, b.thumbnail))
+
+    if diff.similar(threshold) is None:
+        diff = FrameDiff(diff.thumbnail, _mismatch_fraction(a.image, b.image))
+
+    return diff
+
+
+def _known_diff(diffs: FrameDiffCache | None, sha1_a: str, sha1_b: str) -> FrameDiff:
+    return FrameDiff(*diffs.get(sha1_a, sha1_b)) if diffs else _NO_DIFF
+
 
-    return diff_fraction <= threshold
+def _record_diff(
+    diffs: FrameDiffCache | None, sha1_a: str, sha1_b: str, diff: FrameDiff
+) -> None:
+    if diffs is not None and sha1_a != sha1_b:
+        diffs.put(sha1_a, sha1_b, diff.thumbnail, diff.full)
 
 
 def deduplicate_frames(
-    frames: list[ScreencastFrame], zf: zipfile.ZipFile, threshold: float = 0.01
+    frames: list[ScreencastFrame],
+    zf: zipfile.ZipFile,
+    threshold: float = 0.01,
+    jobs: int = 1,
+    images: FrameImageCache | None = None,
+    diffs: FrameDiffCache | None = None,
 ) -> list[ScreencastFrame]:
+    """
+    Drop frames whose mismatch against the last kept frame is within `threshold`. With `jobs` > 1, frames are
+    decoded and compared in threads; the kept frames are the same either way. Pairs found in `diffs` are decided
+    without decoding, and newly measured pairs are added to it.
+    """
     if not frames:
         return frames
 
-    resource_names = set(zf.namelist())
-    result = []
-    last_kept_image = None
+    return list(iter_deduplicated_frames(frames, zf, threshold, jobs, images, diffs))
+
+
+def iter_deduplicated_frames(
+    frames: list[ScreencastFrame],
+    zf: zipfile.ZipFile,
+    threshold: float = 0.01,
+    jobs: int = 1,
+    images: FrameImageCache | None = None,
+    diffs: FrameDiffCache | None = None,
+    reverse: bool = False,
+) -> Generator[ScreencastFrame, None, None]:
+    """
+    Lazily yield the frames `deduplicate_frames` keeps, decoding only as far as the caller consumes.
+
+    With `reverse`, the timeline is walked from the end, comparing each frame with the last kept later one, so
+    the final few distinct frames cost a handful of decodes however long the trace is.
+
+    A frame repeating the sha1 of one already found similar to the last kept frame is dropped without decoding.
+    """
+    images = images or FrameImageCache(zf)
+    frames = [f for f in frames if resource_info(zf, f.sha1) is not None]
+    if reverse:
+        frames.reverse()
+
+    # decoding and diffing are CPU-bound, so threads beyond the core count only add contention
+    jobs = min(jobs, os.cpu_count() or 1)
+    if jobs > 1:
+        yield from _iter_deduplicated_frames_pipelined(
+            frames, images, threshold, jobs, diffs
+        )
+        return
+
+    last_kept: str | None = None
+    # sha1s known to match the last kept frame, including its own
+    similar_shas: set[str] = set()
 
     for frame in frames:
-        resource_path = f"resources/{frame.sha1}"
-        if resource_path not in resource_names:
+        if frame.sha1 in similar_shas:
             continue
 
         try:
-            current_image = _load_image(zf, frame.sha1)
-        except Exception:
-            result.append(frame)
+            if last_kept is None:
+                # an undecodable frame is kept but never becomes the reference
+                images.get(frame.sha1)
+                similar = False
+            else:
+                similar = _sha1s_are_similar(
+                    images, diffs, last_kept, frame.sha1, threshold
+                )
+        except (OSError, UnidentifiedImageError):
+            yield frame
             continue
 
-        if last_kept_image is None:
-            result.append(frame)
-            last_kept_image = current_image
-        elif not _images_are_similar(last_kept_image, current_image, threshold):
-            result.append(frame)
-            last_kept_image = current_image
+        if similar:
+            similar_shas.add(frame.sha1)
+        else:
+            yield frame
+            last_kept = frame.sha1
+            similar_shas = {frame.sha1}
 
-    return result
+
+def _sha1s_are_similar(
+    images: FrameImageCache,
+    diffs: FrameDiffCache | None,
+    sha1_a: str,
+    sha1_b: str,
+    threshold: float,
+) -> bool:
+    known = _known_diff(diffs, sha1_a, sha1_b)
+    similar = known.similar(threshold)
+    if similar is not None:
+        return similar
+
+    diff = _diff_frames(images.get(sha1_a), images.get(sha1_b), threshold, known)
+    _record_diff(diffs, sha1_a, sha1_b, diff)
+    return bool(diff.similar(threshold))
+
+
+def _iter_deduplicated_frames_pipelined(
+    frames: list[ScreencastFrame],
+    images: FrameImageCache,
+    threshold: float,
+    jobs: int,
+    diffs: FrameDiffCache | None = None,
+) -> Iterator[ScreencastFrame]:
+    """
+    One pool decodes frames ahead while another speculatively compares each upcoming sha1 with the last kept
+    frame. Most frames are dropped, so the speculation usually holds; keeping a frame discards the comparisons
+    made against the previous one. Pairs `diffs` already settles are never decoded.
+    """
+    lookahead = jobs * DEDUPE_LOOKAHEAD_PER_JOB
+    last_kept: str | None = None
+
+    decoded: dict[str, Future[FrameImage]] = {}
+    # keyed by sha1, so repeated frames share one comparison against the last kept frame
+    comparisons: dict[str, Future[FrameDiff]] = {}
+
+    # separate pools so comparisons waiting on a decode can never starve the decoders
+    with (
+        ThreadPoolExecutor(jobs) as decoder,
+        ThreadPoolExecutor(jobs) as comparer,
+    ):
+
+        def decode(sha1: str) -> Future[FrameImage]:
+            if sha1 not in decoded:
+                decoded[sha1] = decoder.submit(images.get, sha1)
+            return decoded[sha1]
+
+        try:
+            for index, frame in enumerate(frames):
+                # upcoming sha1s in timeline order, first appearance only
+                window = list(
+                    dict.fromkeys(f.sha1 for f in frames[index : index + lookahead])
+                )
+                for sha1 in decoded.keys() - set(window) - {last_kept}:
+                    del decoded[sha1]
+
+                if last_kept is not None:
+                    for sha1 in window:
+                        if sha1 not in comparisons:
+                            known = _known_diff(diffs, last_kept, sha1)
+                            if known.similar(threshold) is not None:
+                                comparisons[sha1] = _resolved(known)
+                            else:
+                                comparisons[sha1] = comparer.submit(
+                                    _compare_decoded,
+                                    decode(last_kept),
+                                    decode(sha1),
+                                    threshold,
+                                    known,
+                                )
+
+                        # the reference changes by this frame at the latest, so nothing past it is compared with it
+                        comparison = comparisons[sha1]
+                        if _succeeded(comparison) and not comparison.result().similar(
+                            threshold
+                        ):
+                            break
+
+                try:
+                    if last_kept is None:
+                        # an undecodable frame is kept but never becomes the reference
+                        decode(frame.sha1).result()
+                        similar = False
+                    else:
+                        diff = comparisons[frame.sha1].result()
+                        _record_diff(diffs, last_kept, frame.sha1, diff)
+                        similar = diff.similar(threshold)
+                except (OSError, UnidentifiedImageError):
+                    yield frame
+                    continue
+
+                if not similar:
+                    for sha1, stale in comparisons.items():
+                        # speculation that already finished is kept for the next run over these frames
+                        if last_kept is not None and _succeeded(stale):
+                            _record_diff(diffs, last_kept, sha1, stale.result())
+                        stale.cancel()
+
+                    yield frame
+                    last_kept = frame.sha1
+                    comparisons = {frame.sha1: _resolved(FrameDiff(full=0.0))}
+        finally:
+            # a caller that stops early shouldn't wait for work queued on frames it will never see
+            for future in [*decoded.values(), *comparisons.values()]:
+                future.cancel()
+
+
+def _compare_decoded(
+    last_kept: Future[FrameImage],
+    current: Future[FrameImage],
+    threshold: float,
+    known: FrameDiff,
+) -> FrameDiff:
+    return _diff_frames(last_kept.result(), current.result(), threshold, known)
+
+
+def _resolved(diff: FrameDiff) -> Future[FrameDiff]:
+    future: Future[FrameDiff] = Future()
+    future.set_result(diff)
+    return future
+
+
+def _succeeded(future: Future[FrameDiff]) -> bool:
+    return future.done() and not future.cancelled() and future.exception() is None
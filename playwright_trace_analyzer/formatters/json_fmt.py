@@ -1,50 +1,97 @@
-import json
+from pydantic import TypeAdapter
 
 from playwright_trace_analyzer.models import (
     TraceData,
     ConsoleMessage,
+    NetworkGroupStats,
     NetworkRequest,
+    ResponseBody,
     Action,
     TraceMetadata,
+    TraceError,
 )
+from playwright_trace_analyzer import json_backend
 
+_actions_adapter = TypeAdapter(list[Action])
+_console_adapter = TypeAdapter(list[ConsoleMessage])
+_network_adapter = TypeAdapter(list[NetworkRequest])
+_errors_adapter = TypeAdapter(list[TraceError])
+_network_stats_adapter = TypeAdapter(list[NetworkGroupStats])
+_body_adapter = TypeAdapter(ResponseBody)
 
-def format_trace_data(data: TraceData, last_n_actions: int = 20) -> str:
+
+def format_trace_data(
+    data: TraceData, last_n_actions: int = 20, indent: bool = True
+) -> str:
     output = {
         "metadata": data.metadata.model_dump(),
-        "errors": [e.model_dump() for e in data.errors],
-        "console_errors_warnings": [
-            m.model_dump()
-            for m in data.console_messages
-            if m.message_type in ["error", "warning"]
-        ],
-        "failed_network_requests": [
-            r.model_dump()
-            for r in data.network_requests
-            if r.status >= 400 or r.failure_text
-        ],
-        "action_timeline": [
-            a.model_dump() for a in _get_last_n_actions(data.actions, last_n_actions)
-        ],
+        "errors": _errors_adapter.dump_python(data.errors),
+        "console_errors_warnings": _console_adapter.dump_python(
+            [m for m in data.console_messages if m.message_type in ["error", "warning"]]
+        ),
+        "failed_network_requests": _network_adapter.dump_python(
+            [r for r in data.network_requests if r.status >= 400 or r.failure_text]
+        ),
+        "action_timeline": _actions_adapter.dump_python(
+            _get_last_n_actions(data.actions, last_n_actions)
+        ),
     }
 
-    return json.dumps(output, indent=2)
+    return json_backend.dumps(output, indent)
+
+
+def format_actions(
+    actions: list[Action],
+    indent: bool = True,
+    network: dict[str, list[NetworkRequest]] | None = None,
+    console: dict[str, list[ConsoleMessage]] | None = None,
+) -> str:
+    """With `network` or `console` (keyed by call id), each action also lists the records attributed to it."""
+    output = _actions_adapter.dump_python(actions)
+
+    for action, action_output in zip(actions, output):
+        if network is not None:
+            action_output["network_requests"] = _network_adapter.dump_python(
+                network.get(action.call_id, [])
+            )
+        if console is not None:
+            action_output["console_messages"] = _console_adapter.dump_python(
+                console.get(action.call_id, [])
+            )
+
+    return json_backend.dumps(output, indent)
+
+
+def format_console(messages: list[ConsoleMessage], indent: bool = True) -> str:
+    return json_backend.dumps(_console_adapter.dump_python(messages), indent)
+
+
+def format_network(
+    requests: list[NetworkRequest],
+    indent: bool = True,
+    bodies: list[ResponseBody | None] | None = None,
+) -> str:
+    """With `bodies` (one per request), each request also carries its `body`."""
+    output = _network_adapter.dump_python(requests)
 
+    if bodies is not None:
+        for request_output, body in zip(output, bodies):
+            request_output["body"] = dump_response_body(body)
 
-def format_actions(actions: list[Action]) -> str:
-    return json.dumps([a.model_dump() for a in actions], indent=2)
+    return json_backend.dumps(output, indent)
 
 
-def format_console(messages: list[ConsoleMessage]) -> str:
-    return json.dumps([m.model_dump() for m in messages], indent=2)
+def dump_response_body(body: ResponseBody | None) -> dict | None:
+    """A body as a JSON-ready dict, or None for a request without one."""
+    return None if body is None else _body_adapter.dump_python(body)
 
 
-def format_network(requests: list[NetworkRequest]) -> str:
-    return json.dumps([r.model_dump() for r in requests], indent=2)
+def format_network_stats(groups: list[NetworkGroupStats], indent: bool = True) -> str:
+    return json_backend.dumps(_network_stats_adapter.dump_python(groups), indent)
 
 
-def format_metadata(metadata: TraceMetadata) -> str:
-    return json.dumps(metadata.model_dump(), indent=2)
+def format_metadata(metadata: TraceMetadata, indent: bool = True) -> str:
+    return json_backend.dumps(metadata.model_dump(), indent)
 
 
 def _get_last_n_actions(actions: list[Action], n: int) -> list[Action]:
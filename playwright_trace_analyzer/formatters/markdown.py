@@ -1,7 +1,9 @@
 from playwright_trace_analyzer.models import (
     TraceData,
     ConsoleMessage,
+    NetworkGroupStats,
     NetworkRequest,
+    ResponseBody,
     Action,
     TraceMetadata,
 )
@@ -32,7 +34,11 @@ def format_trace_data(data: TraceData, last_n_actions: int = 20) -> str:
     return "\n\n".join(sections)
 
 
-def format_actions(actions: list[Action]) -> str:
+def format_actions(
+    actions: list[Action],
+    network: dict[str, list[NetworkRequest]] | None = None,
+    console: dict[str, list[ConsoleMessage]] | None = None,
+) -> str:
     lines = ["# Actions\n"]
 
     for action in actions:
@@ -61,6 +67,19 @@ def format_actions(actions: list[Action]) -> str:
             for log in action.log_messages:
                 lines.append(f"- {log.message}")
 
+        if network and network.get(action.call_id):
+            lines.append("\n**Network:**")
+            for req in network[action.call_id]:
+                status_icon = "❌" if req.status >= 400 or req.failure_text else "✓"
+                lines.append(
+                    f"- {status_icon} {req.method} {req.url} {req.status} ({req.duration_ms:.2f}ms)"
+                )
+
+        if console and console.get(action.call_id):
+            lines.append("\n**Console:**")
+            for msg in console[action.call_id]:
+                lines.append(f"- [{msg.message_type.upper()}] {msg.text}")
+
         lines.append("")
 
     return "\n".join(lines)
@@ -79,10 +98,12 @@ def format_console(messages: list[ConsoleMessage]) -> str:
     return "\n".join(lines)
 
 
-def format_network(requests: list[NetworkRequest]) -> str:
+def format_network(
+    requests: list[NetworkRequest], bodies: list[ResponseBody | None] | None = None
+) -> str:
     lines = ["# Network Requests\n"]
 
-    for req in requests:
+    for index, req in enumerate(requests):
         status_icon = "❌" if req.status >= 400 or req.failure_text else "✓"
         lines.append(f"## {status_icon} {req.method} {req.url}")
         lines.append(f"**Status:** {req.status} {req.status_text}")
@@ -95,11 +116,47 @@ def format_network(requests: list[NetworkRequest]) -> str:
         if req.failure_text:
             lines.append(f"**Failure:** {req.failure_text}")
 
+        body = bodies[index] if bodies is not None else None
+        if body is not None:
+            lines.extend(_format_body(body))
+
         lines.append("")
 
     return "\n".join(lines)
 
 
+def _format_body(body: ResponseBody) -> list[str]:
+    notes = [f"{body.size} bytes stored"]
+    if body.decompressed:
+        notes.append("gunzipped")
+    if body.truncated:
+        notes.append("truncated")
+
+    # base64 is no use to a reader; the JSON output carries it
+    if body.encoding != "text":
+        return [f"**Body:** binary ({', '.join(notes)})"]
+
+    fence = "````" if "```" in body.content else "```"
+    return [f"**Body:** ({', '.join(notes)})", fence, body.content, fence]
+
+
+def format_network_stats(groups: list[NetworkGroupStats]) -> str:
+    lines = [
+        "# Network Stats\n",
+        "| Method | Host | Path | Content-Type | Count | Failed | Bytes | p50 | p95 | p99 | Max |",
+        "| --- | --- | --- | --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: |",
+    ]
+
+    for group in groups:
+        lines.append(
+            f"| {group.method} | {group.host} | `{group.path}` | {group.content_type or ''} "
+            f"| {group.count} | {group.failed} | {group.total_bytes} "
+            f"| {group.p50_ms:.2f}ms | {group.p95_ms:.2f}ms | {group.p99_ms:.2f}ms | {group.max_ms:.2f}ms |"
+        )
+
+    return "\n".join(lines)
+
+
 def format_metadata(metadata: TraceMetadata) -> str:
     return _format_metadata_section(metadata)
 
@@ -0,0 +1,58 @@
+"""
+One compact JSON record per line, produced lazily: each formatter yields a record's line as soon as the record is
+read, so output starts before the input is exhausted and no list of dumped records is ever held.
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+
+from pydantic import TypeAdapter
+
+from playwright_trace_analyzer import json_backend
+from playwright_trace_analyzer.formatters.json_fmt import dump_response_body
+from playwright_trace_analyzer.models import (
+    Action,
+    ConsoleMessage,
+    NetworkRequest,
+    ResponseBody,
+)
+
+_action_adapter = TypeAdapter(Action)
+_console_adapter = TypeAdapter(ConsoleMessage)
+_request_adapter = TypeAdapter(NetworkRequest)
+_console_list_adapter = TypeAdapter(list[ConsoleMessage])
+_network_list_adapter = TypeAdapter(list[NetworkRequest])
+
+
+def format_actions(
+    actions: Iterable[Action],
+    network: dict[str, list[NetworkRequest]] | None = None,
+    console: dict[str, list[ConsoleMessage]] | None = None,
+) -> Iterator[str]:
+    for action in actions:
+        record = _action_adapter.dump_python(action)
+        if network is not None:
+            record["network_requests"] = _network_list_adapter.dump_python(
+                network.get(action.call_id, [])
+            )
+        if console is not None:
+            record["console_messages"] = _console_list_adapter.dump_python(
+                console.get(action.call_id, [])
+            )
+        yield json_backend.dumps(record, indent=False)
+
+
+def format_console(messages: Iterable[ConsoleMessage]) -> Iterator[str]:
+    for message in messages:
+        yield json_backend.dumps(_console_adapter.dump_python(message), indent=False)
+
+
+def format_network(
+    requests: Iterable[NetworkRequest],
+    read_body: Callable[[NetworkRequest], ResponseBody | None] | None = None,
+) -> Iterator[str]:
+    """With `read_body`, each request also carries its `body`, read just before the request is written."""
+    for request in requests:
+        record = _request_adapter.dump_python(request)
+        if read_body is not None:
+            record["body"] = dump_response_body(read_body(request))
+        yield json_backend.dumps(record, indent=False)
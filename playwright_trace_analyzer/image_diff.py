@@ -0,0 +1,175 @@
+"""
+Whole-frame port of pixelmatch's mismatch count.
+
+Every step mirrors pixelmatch's arithmetic and tie-breaking, so counts match `pixelmatch.contrib.PIL.pixelmatch`
+exactly while working on arrays instead of a per-pixel Python loop.
+"""
+
+import numpy as np
+from PIL import Image
+
+# 35215 is the largest possible YIQ delta; pixelmatch compares squared deltas against this scaled by threshold²
+MAX_YIQ_DELTA = 35215
+
+# pixelmatch visits neighbours column by column, and keeps the first darkest/brightest one it sees
+_NEIGHBOUR_OFFSETS = [
+    (dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)
+]
+
+
+def count_different_pixels(
+    img_a: Image.Image, img_b: Image.Image, threshold: float = 0.1
+) -> int:
+    """Number of pixels pixelmatch would report as different, ignoring anti-aliasing like its defaults do."""
+    assert img_a.size == img_b.size, "images must be the same size"
+
+    rgba_a = np.asarray(img_a.convert("RGBA"))
+    rgba_b = np.asarray(img_b.convert("RGBA"))
+    pixels_a = _pack(rgba_a)
+    pixels_b = _pack(rgba_b)
+
+    # identical pixels have a zero delta, so only the differing ones need the full YIQ comparison
+    changed = np.flatnonzero(pixels_a != pixels_b)
+    if not changed.size:
+        return 0
+
+    rgb_a = _blend_white(rgba_a.reshape(-1, 4)[changed])
+    rgb_b = _blend_white(rgba_b.reshape(-1, 4)[changed])
+
+    y = _brightness(rgb_a) - _brightness(rgb_b)
+    i = _in_phase(rgb_a) - _in_phase(rgb_b)
+    q = _quadrature(rgb_a) - _quadrature(rgb_b)
+    delta = 0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q
+
+    candidates = changed[delta > MAX_YIQ_DELTA * threshold * threshold]
+    if not candidates.size:
+        return 0
+
+    many_siblings = _has_many_siblings(pixels_a) & _has_many_siblings(pixels_b)
+
+    antialiased = _antialiased(rgba_a, many_siblings, candidates)
+    antialiased |= _antialiased(rgba_b, many_siblings, candidates)
+
+    return int(np.count_nonzero(~antialiased))
+
+
+def _blend_white(rgba: np.ndarray) -> list[np.ndarray]:
+    """Float r, g, b channels of `rgba` (shape (..., 4)) blended with white by alpha, as pixelmatch does."""
+    channels = [rgba[..., channel].astype(np.float64) for channel in range(3)]
+
+    alpha = rgba[..., 3]
+    if (alpha == 255).all():
+        return channels
+
+    # blending an opaque pixel (a == 1.0) is exact, so every pixel can take the same path
+    alpha = alpha / 255
+    return [255 + (channel - 255) * alpha for channel in channels]
+
+
+def _brightness(rgb: list[np.ndarray]) -> np.ndarray:
+    r, g, b = rgb
+    return r * 0.29889531 + g * 0.58662247 + b * 0.11448223
+
+
+def _in_phase(rgb: list[np.ndarray]) -> np.ndarray:
+    r, g, b = rgb
+    return r * 0.59597799 - g * 0.27417610 - b * 0.32180189
+
+
+def _quadrature(rgb: list[np.ndarray]) -> np.ndarray:
+    r, g, b = rgb
+    return r * 0.21147017 - g * 0.52261711 + b * 0.31114694
+
+
+def _pack(rgba: np.ndarray) -> np.ndarray:
+    """One uint32 per pixel, so pixel equality is a single comparison."""
+    return np.ascontiguousarray(rgba).view(np.uint32)[..., 0]
+
+
+def _border_mask(height: int, width: int) -> np.ndarray:
+    border = np.zeros((height, width), dtype=np.int8)
+    border[[0, -1], :] = 1
+    border[:, [0, -1]] = 1
+    return border
+
+
+def _has_many_siblings(pixels: np.ndarray) -> np.ndarray:
+    """Whether each pixel has 3+ identical neighbours, counting the image border as one."""
+    height, width = pixels.shape
+    equal = _border_mask(height, width)
+
+    for dx, dy in _NEIGHBOUR_OFFSETS:
+        target, source = _shifted_slices(dx, dy)
+        equal[target] += pixels[target] == pixels[source]
+
+    return equal > 2
+
+
+def _shifted_slices(
+    dx: int, dy: int
+) -> tuple[tuple[slice, slice], tuple[slice, slice]]:
+    """Slices pairing each pixel (first) with its in-bounds neighbour at (x + dx, y + dy) (second)."""
+
+    def axis(offset: int) -> tuple[slice, slice]:
+        if offset > 0:
+            return slice(None, -offset), slice(offset, None)
+        if offset < 0:
+            return slice(-offset, None), slice(None, offset)
+        return slice(None), slice(None)
+
+    target_y, source_y = axis(dy)
+    target_x, source_x = axis(dx)
+    return (target_y, target_x), (source_y, source_x)
+
+
+def _antialiased(
+    rgba: np.ndarray, many_siblings: np.ndarray, candidates: np.ndarray
+) -> np.ndarray:
+    """pixelmatch's anti-aliasing test for the `candidates` (flat pixel indices) of one image."""
+    height, width = rgba.shape[:2]
+    pixels = rgba.reshape(-1, 4)
+    ys, xs = np.divmod(candidates, width)
+
+    zeroes = _border_mask(height, width).ravel()[candidates].astype(np.int16)
+    min_delta = np.zeros(candidates.size)
+    max_delta = np.zeros(candidates.size)
+    darkest = np.zeros_like(candidates)
+    brightest = np.zeros_like(candidates)
+
+    # near-duplicates only need the candidates' neighbourhoods; heavily changed frames are cheaper to map whole
+    if candidates.size * len(_NEIGHBOUR_OFFSETS) > len(pixels):
+        brightness_map = _brightness(_blend_white(pixels))
+
+        def brightness(indices: np.ndarray) -> np.ndarray:
+            return brightness_map[indices]
+    else:
+
+        def brightness(indices: np.ndarray) -> np.ndarray:
+            return _brightness(_blend_white(pixels[indices]))
+
+    center = brightness(candidates)
+
+    for dx, dy in _NEIGHBOUR_OFFSETS:
+        ny, nx = ys + dy, xs + dx
+        inside = (ny >= 0) & (ny < height) & (nx >= 0) & (nx < width)
+        neighbours = np.clip(ny, 0, height - 1) * width + np.clip(nx, 0, width - 1)
+
+        # out-of-bounds neighbours get NaN, which fails every comparison like pixelmatch skipping them
+        delta = np.where(inside, center - brightness(neighbours), np.nan)
+        zeroes += delta == 0
+
+        darker = delta < min_delta
+        np.copyto(min_delta, delta, where=darker)
+        darkest[darker] = neighbours[darker]
+
+        brighter = delta > max_delta
+        np.copyto(max_delta, delta, where=brighter)
+        brightest[brighter] = neighbours[brighter]
+
+    siblings = many_siblings.ravel()
+    return (
+        (zeroes <= 2)
+        & (min_delta != 0)
+        & (max_delta != 0)
+        & (siblings[darkest] | siblings[brightest])
+    )
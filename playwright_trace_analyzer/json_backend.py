@@ -0,0 +1,56 @@
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class JsonBackend:
+    name: str
+    loads: Callable[[bytes | str], object]
+    dumps: Callable[[object, bool], str]
+
+
+def _stdlib_dumps(value: object, indent: bool) -> str:
+    if indent:
+        return json.dumps(value, indent=2)
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _orjson_backend() -> JsonBackend | None:
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    # orjson rejects some JSON the stdlib accepts, notably lone surrogate escapes such as "\ud83d", which
+    # JSON.stringify writes when it cuts an emoji in half; those inputs fall back to the stdlib
+    def loads(data: bytes | str) -> object:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+
+    def dumps(value: object, indent: bool) -> str:
+        try:
+            return orjson.dumps(
+                value, option=orjson.OPT_INDENT_2 if indent else 0
+            ).decode()
+        except orjson.JSONEncodeError:
+            return _stdlib_dumps(value, indent)
+
+    return JsonBackend("orjson", loads, dumps)
+
+
+STDLIB = JsonBackend("json", json.loads, _stdlib_dumps)
+
+# orjson escapes nothing beyond what JSON requires, so output can differ from the stdlib byte-wise (non-ASCII text is
+# written as UTF-8 rather than \u escapes) while staying semantically identical
+backend = _orjson_backend() or STDLIB
+
+
+def loads(data: bytes | str) -> object:
+    return backend.loads(data)
+
+
+def dumps(value: object, indent: bool = True) -> str:
+    return backend.dumps(value, indent)
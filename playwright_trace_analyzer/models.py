@@ -1,5 +1,13 @@
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, cast, overload
+
 from pydantic import BaseModel
 
+if TYPE_CHECKING:
+    from playwright_trace_analyzer.cache import TraceCache
+
 
 class Size(BaseModel):
     width: int
@@ -20,23 +28,29 @@ class TraceMetadata(BaseModel):
     trace_start_time: float = 0
 
 
-class SourceLocation(BaseModel):
+# records are unvalidated slotted dataclasses since a trace yields hundreds of thousands of them; callers coerce
+# numeric fields themselves and pydantic is only involved when serializing (see formatters.json_fmt)
+@dataclass(slots=True, kw_only=True)
+class SourceLocation:
     url: str
     line_number: int | None = None
     column_number: int | None = None
 
 
-class LogMessage(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class LogMessage:
     time: float
     message: str
 
 
-class ActionError(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class ActionError:
     error: str
     stack: str | None = None
 
 
-class Action(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class Action:
     call_id: str
     title: str | None = None
     class_name: str
@@ -46,10 +60,11 @@ class Action(BaseModel):
     end_time: float | None = None
     page_id: str | None = None
     error: ActionError | None = None
-    log_messages: list[LogMessage] = []
+    log_messages: list[LogMessage] = field(default_factory=list)
 
 
-class ConsoleMessage(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class ConsoleMessage:
     time: float
     page_id: str | None = None
     message_type: str
@@ -57,7 +72,8 @@ class ConsoleMessage(BaseModel):
     location: SourceLocation
 
 
-class NetworkRequest(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class NetworkRequest:
     method: str
     url: str
     status: int
@@ -67,9 +83,38 @@ class NetworkRequest(BaseModel):
     duration_ms: float
     response_size: int
     content_type: str | None = None
+    page_id: str | None = None
+    start_time: float | None = None
+    body_sha1: str | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class ResponseBody:
+    sha1: str
+    size: int
+    encoding: str
+    content: str
+    truncated: bool = False
+    decompressed: bool = False
+
+
+@dataclass(slots=True, kw_only=True)
+class NetworkGroupStats:
+    method: str
+    host: str
+    path: str
+    content_type: str | None = None
+    count: int
+    failed: int
+    total_bytes: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
 
 
-class TraceError(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class TraceError:
     time: float
     error_type: str
     message: str
@@ -77,7 +122,8 @@ class TraceError(BaseModel):
     page_id: str | None = None
 
 
-class ScreencastFrame(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class ScreencastFrame:
     timestamp: float
     page_id: str
     sha1: str
@@ -85,10 +131,99 @@ class ScreencastFrame(BaseModel):
     height: int
 
 
-class TraceData(BaseModel):
-    metadata: TraceMetadata
-    actions: list[Action]
-    console_messages: list[ConsoleMessage]
-    network_requests: list[NetworkRequest]
-    errors: list[TraceError]
-    screenshots: list[ScreencastFrame]
+class _Section[SectionT]:
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    @overload
+    def __get__(self, data: None, owner: type) -> "_Section[SectionT]": ...
+
+    @overload
+    def __get__(self, data: "TraceData", owner: type) -> SectionT: ...
+
+    def __get__(
+        self, data: "TraceData | None", owner: type
+    ) -> "SectionT | _Section[SectionT]":
+        if data is None:
+            return self
+        return cast(SectionT, data.load(self.name))
+
+    def __set__(self, data: "TraceData", value: SectionT) -> None:
+        data._sections[self.name] = value
+        data._assigned.add(self.name)
+
+
+class TraceData:
+    """
+    A parsed trace whose sections are extracted on first access and memoized.
+
+    `sections` names the sections the caller is about to read so they are extracted together in a single pass
+    over the archive. `loaded_sections` records what has actually been computed.
+    """
+
+    metadata = _Section[TraceMetadata]()
+    actions = _Section[list[Action]]()
+    console_messages = _Section[list[ConsoleMessage]]()
+    network_requests = _Section[list[NetworkRequest]]()
+    errors = _Section[list[TraceError]]()
+    screenshots = _Section[list[ScreencastFrame]]()
+
+    def __init__(
+        self,
+        trace_path: Path,
+        sections: Iterable[str] = (),
+        cache: "TraceCache | None" = None,
+        jobs: int = 1,
+    ):
+        self.trace_path = trace_path
+        self.cache = cache
+        self.jobs = jobs
+        self.loaded_sections: list[str] = []
+        self._sections: dict[str, object] = {}
+        # sections the caller replaced, e.g. with a filtered list, which must not feed other sections
+        self._assigned: set[str] = set()
+        self._pending = set(sections)
+
+    def load(self, name: str) -> object:
+        if name not in self._sections:
+            requested = (self._pending | {name}) - self._sections.keys()
+            loaded = self._load_sections(requested)
+
+            # sections extracted alongside the requested ones never replace what the caller already holds
+            new = {k: v for k, v in loaded.items() if k not in self._sections}
+            self._sections.update(new)
+            self.loaded_sections.extend(new)
+            self._pending.clear()
+
+        return self._sections[name]
+
+    def _extracted_actions(self) -> "list[Action] | None":
+        """The actions as extracted, which errors can be derived from without extracting them again."""
+        if "actions" in self._assigned or "actions" not in self._sections:
+            return None
+        return cast(list[Action], self._sections["actions"])
+
+    def _load_sections(self, names: set[str]) -> dict[str, object]:
+        from playwright_trace_analyzer.parser import load_sections
+
+        actions = self._extracted_actions()
+        if self.cache is None:
+            return load_sections(self.trace_path, names, self.jobs, actions)
+
+        cache_key = self.cache.trace_key(self.trace_path)
+        sections = {}
+
+        for name in names:
+            value = self.cache.get(cache_key, name)
+            if value is not None:
+                sections[name] = value
+
+        missing = names - sections.keys()
+        if not missing:
+            return sections
+
+        loaded = load_sections(self.trace_path, missing, self.jobs, actions)
+        for name, value in loaded.items():
+            self.cache.put(cache_key, name, value)
+
+        return sections | loaded
@@ -0,0 +1,67 @@
+import re
+from collections.abc import Iterator
+from typing import IO
+
+from playwright_trace_analyzer import json_backend
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def iter_line_batches(
+    f: IO[bytes], chunk_size: int = CHUNK_SIZE
+) -> Iterator[list[bytes]]:
+    """Read a newline-delimited stream in large chunks and yield the complete lines of each chunk."""
+    remainder = b""
+
+    while chunk := f.read(chunk_size):
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        yield lines
+
+    if remainder:
+        yield [remainder]
+
+
+def iter_line_chunks(f: IO[bytes], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Like `iter_line_batches`, but yield each chunk's complete lines unsplit so they can be searched in bulk."""
+    remainder = b""
+
+    while chunk := f.read(chunk_size):
+        chunk = remainder + chunk
+        end = chunk.rfind(b"\n") + 1
+        remainder = chunk[end:]
+        if end:
+            yield chunk[:end]
+
+    if remainder:
+        yield remainder
+
+
+def lines_matching(chunk: bytes, pattern: re.Pattern[bytes]) -> list[bytes]:
+    """The lines of `chunk` containing a match for `pattern`, found in one scan of the whole chunk."""
+    lines = []
+    end = -1
+
+    for match in pattern.finditer(chunk):
+        # later matches on a line already taken
+        if match.start() <= end:
+            continue
+
+        start = chunk.rfind(b"\n", 0, match.start()) + 1
+        end = chunk.find(b"\n", match.end())
+        if end == -1:
+            end = len(chunk)
+        lines.append(chunk[start:end])
+
+    return lines
+
+
+def decode_lines(lines: list[bytes]) -> list[dict]:
+    """Decode a batch of JSON lines with a single parser call, skipping blank lines."""
+    lines = [line for line in lines if line and not line.isspace()]
+    if not lines:
+        return []
+
+    decoded = json_backend.loads(b"[" + b",".join(lines) + b"]")
+    assert isinstance(decoded, list)
+    return decoded
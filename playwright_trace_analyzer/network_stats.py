@@ -0,0 +1,174 @@
+"""
+Request counts, bytes and latency quantiles grouped by endpoint.
+
+Requests are grouped by method, host, path template and content type, and folded into constant-size quantile
+sketches as they are read, so a trace's requests never need to be held in memory at once.
+"""
+
+import re
+import zipfile
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from playwright_trace_analyzer.cache import TraceCache
+from playwright_trace_analyzer.extractors.network import (
+    NetworkRequestFilter,
+    iter_network_entry,
+)
+from playwright_trace_analyzer.models import NetworkGroupStats, NetworkRequest
+from playwright_trace_analyzer.parser import map_entries
+from playwright_trace_analyzer.quantiles import QuantileSketch
+
+# path segments that identify a record rather than an endpoint, named after their placeholder; the alternatives are
+# tried in order and must span the whole segment
+_RECORD_SEGMENT = re.compile(
+    r"(?<=/)(?:"
+    r"(?P<id>\d+)"
+    r"|(?P<uuid>[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})"
+    r"|(?P<hash>[0-9a-fA-F]{16,})"
+    # long opaque tokens (base64 ids, signed keys) mix letters and digits
+    r"|(?P<token>(?=[^/]*\d)[A-Za-z0-9_-]{24,})"
+    r")(?=/|$)"
+)
+
+# scheme, authority and path of a URL; far cheaper than urlsplit, which matters at one call per request
+_URL_PARTS = re.compile(r"([A-Za-z][A-Za-z0-9+.-]*):(?://([^/?#]*))?([^?#]*)")
+
+GroupKey = tuple[str, str, str, str | None]
+
+_SORT_ATTRIBUTES = {
+    "p50": "p50_ms",
+    "p95": "p95_ms",
+    "p99": "p99_ms",
+    "max": "max_ms",
+    "count": "count",
+    "bytes": "total_bytes",
+}
+
+SORT_KEYS = tuple(_SORT_ATTRIBUTES)
+
+
+def path_template(url: str) -> tuple[str, str]:
+    """The host and the path of `url` with ids, uuids, hashes and tokens replaced by placeholders."""
+    match = _URL_PARTS.match(url)
+    if match is None:
+        return "", url.split("?")[0]
+
+    scheme, host, path = match.groups()
+
+    # inline payloads would make every request its own group
+    if scheme in ("data", "blob"):
+        return "", f"{scheme}:"
+
+    path = _RECORD_SEGMENT.sub(lambda m: f"{{{m.lastgroup}}}", path)
+    return host or "", path or "/"
+
+
+def _media_type(content_type: str | None) -> str | None:
+    if not content_type:
+        return None
+    return content_type.split(";")[0].strip().lower()
+
+
+@dataclass(slots=True)
+class _GroupAccumulator:
+    count: int = 0
+    failed: int = 0
+    total_bytes: int = 0
+    latency: QuantileSketch = field(default_factory=QuantileSketch)
+
+
+class NetworkStats:
+    """Per-group accumulators; `merge` folds in stats gathered from another `.network` entry."""
+
+    def __init__(self):
+        self._groups: dict[GroupKey, _GroupAccumulator] = {}
+
+    def add(self, request: NetworkRequest) -> None:
+        host, path = path_template(request.url)
+        key = (request.method.upper(), host, path, _media_type(request.content_type))
+
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _GroupAccumulator()
+
+        group.count += 1
+        group.failed += bool(request.status >= 400 or request.failure_text)
+        group.total_bytes += max(request.response_size, 0)
+        group.latency.add(request.duration_ms)
+
+    def add_all(self, requests: Iterable[NetworkRequest]) -> "NetworkStats":
+        for request in requests:
+            self.add(request)
+        return self
+
+    def merge(self, other: "NetworkStats") -> None:
+        for key, theirs in other._groups.items():
+            group = self._groups.get(key)
+            if group is None:
+                self._groups[key] = theirs
+                continue
+
+            group.count += theirs.count
+            group.failed += theirs.failed
+            group.total_bytes += theirs.total_bytes
+            group.latency.merge(theirs.latency)
+
+    def result(self, sort: str = "p95") -> list[NetworkGroupStats]:
+        """Groups ordered by `sort` (one of `SORT_KEYS`), largest first."""
+        assert sort in SORT_KEYS, f"unknown sort key: {sort}"
+
+        groups = [
+            NetworkGroupStats(
+                method=method,
+                host=host,
+                path=path,
+                content_type=content_type,
+                count=group.count,
+                failed=group.failed,
+                total_bytes=group.total_bytes,
+                p50_ms=group.latency.quantile(0.5) or 0.0,
+                p95_ms=group.latency.quantile(0.95) or 0.0,
+                p99_ms=group.latency.quantile(0.99) or 0.0,
+                max_ms=group.latency.max,
+            )
+            for (method, host, path, content_type), group in self._groups.items()
+        ]
+
+        attribute = _SORT_ATTRIBUTES[sort]
+        groups.sort(key=lambda g: getattr(g, attribute), reverse=True)
+        return groups
+
+
+def collect_network_stats(
+    trace_path: Path,
+    request_filter: NetworkRequestFilter | None = None,
+    cache: TraceCache | None = None,
+    jobs: int = 1,
+) -> NetworkStats:
+    """
+    Stats over the trace's requests. An already cached `network_requests` section is folded directly; otherwise
+    each `.network` entry is streamed into its own `NetworkStats` (in a worker process with `jobs` > 1) and merged.
+    """
+    if cache is not None:
+        cached = cache.get(cache.trace_key(trace_path), "network_requests")
+        if isinstance(cached, list):
+            if request_filter is not None:
+                cached = [r for r in cached if request_filter.accepts(r)]
+            return NetworkStats().add_all(cached)
+
+    stats = NetworkStats()
+    with zipfile.ZipFile(trace_path) as zf:
+        for entry_stats in map_entries(
+            zf, ".network", _entry_stats, request_filter, jobs=jobs
+        ):
+            stats.merge(entry_stats)
+
+    return stats
+
+
+def _entry_stats(
+    zf: zipfile.ZipFile, name: str, request_filter: NetworkRequestFilter | None
+) -> NetworkStats:
+    return NetworkStats().add_all(iter_network_entry(zf, name, request_filter))
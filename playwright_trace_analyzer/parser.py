@@ -1,56 +1,320 @@
-import json
+import heapq
+import re
 import zipfile
 from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Protocol, Self, cast
 
-from playwright_trace_analyzer.models import TraceData
+from structlog_config import get_logger
 
+from playwright_trace_analyzer.cache import TraceCache
+from playwright_trace_analyzer.models import Action, TraceData, TraceError
+from playwright_trace_analyzer.ndjson import decode_lines, iter_line_batches
+
+log = get_logger()
+
+# how far an event may appear after later-timestamped events in its own entry and still be emitted in order
+REORDER_WINDOW = 1_024
+
+OPAQUE_EVENT_TYPES = frozenset({"frame-snapshot", "resource-snapshot"})
+
+# playwright serializes `type` as the first key, so the event type can be read without decoding the line
+_EVENT_TYPE_PATTERN = re.compile(rb'\s*\{\s*"type"\s*:\s*"([^"\\]*)"')
+
+
+class EventExtractor(Protocol):
+    """
+    Consumes trace events routed by an `EventDispatcher`.
+
+    `event_types` lists the event `type` values the extractor wants; `None` subscribes to every event except the
+    bulky `OPAQUE_EVENT_TYPES`, which are only decoded when an extractor names them explicitly.
+    """
+
+    @property
+    def event_types(self) -> frozenset[str] | None: ...
+
+    def handle(self, event: dict) -> None: ...
+
+
+class EventDispatcher:
+    def __init__(self, extractors: Iterable[EventExtractor] = ()):
+        self._handlers: dict[str, list[EventExtractor]] = defaultdict(list)
+        self._catch_all: list[EventExtractor] = []
+
+        for extractor in extractors:
+            self.register(extractor)
+
+    def register(self, extractor: EventExtractor) -> None:
+        if extractor.event_types is None:
+            self._catch_all.append(extractor)
+            return
+
+        for event_type in extractor.event_types:
+            self._handlers[event_type].append(extractor)
+
+    def wants(self, event_type: str) -> bool:
+        return self.event_filter()(event_type)
+
+    def event_filter(self) -> "EventTypeFilter":
+        return EventTypeFilter(frozenset(self._handlers), bool(self._catch_all))
+
+    def dispatch(self, event: dict) -> None:
+        for extractor in self._catch_all:
+            extractor.handle(event)
+
+        for extractor in self._handlers.get(event.get("type", ""), ()):
+            extractor.handle(event)
+
+    def run(self, events: Iterable[dict]) -> None:
+        for event in events:
+            self.dispatch(event)
+
+
+class SectionExtractor(EventExtractor, Protocol):
+    """An extractor behind one `TraceData` section. `merge` folds in the state of an extractor run on another entry."""
+
+    def merge(self, other: Self) -> None: ...
+
+    def result(self) -> object: ...
+
+
+@dataclass(frozen=True)
+class EventTypeFilter:
+    """Picklable snapshot of the event types a dispatcher wants, so decoding can happen in worker processes."""
+
+    event_types: frozenset[str]
+    catch_all: bool
+
+    def __call__(self, event_type: str) -> bool:
+        if event_type in self.event_types:
+            return True
+
+        return self.catch_all and event_type not in OPAQUE_EVENT_TYPES
+
+
+SECTIONS = (
+    "metadata",
+    "actions",
+    "console_messages",
+    "network_requests",
+    "errors",
+    "screenshots",
+)
+
+
+def parse_trace_file(
+    trace_path: Path,
+    sections: Iterable[str] = (),
+    cache: TraceCache | None = None,
+    jobs: int = 1,
+) -> TraceData:
+    """
+    Open a trace lazily. Sections are extracted on first access; `sections` lists the ones the caller will read so
+    they share a single pass over the archive. Sections found in `cache` skip extraction entirely. With `jobs` > 1,
+    archives holding several .trace/.network entries decode them in a process pool.
+    """
+    return TraceData(trace_path, sections, cache, jobs)
+
+
+def load_sections(
+    trace_path: Path,
+    names: Iterable[str],
+    jobs: int = 1,
+    actions: list[Action] | None = None,
+) -> dict[str, object]:
+    """Extract the named sections in one pass. Errors include failed actions, taken from `actions` when given."""
+    from playwright_trace_analyzer.extractors.errors import merge_action_errors
+    from playwright_trace_analyzer.extractors.network import (
+        extract_network_requests,
+    )
+
+    names = set(names)
+    unknown = names - set(SECTIONS)
+    assert not unknown, f"unknown trace sections: {unknown}"
+
+    if "errors" in names and actions is None:
+        names.add("actions")
+
+    extractors = _build_section_extractors(names)
+    sections: dict[str, object] = {}
 
-def parse_trace_file(trace_path: Path) -> TraceData:
     with zipfile.ZipFile(trace_path) as zf:
-        events = _extract_events(zf)
+        if extractors and jobs > 1:
+            extractors = _run_section_extractors_per_entry(zf, names, jobs)
+        elif extractors:
+            run_extractors(zf, extractors.values())
 
-        from playwright_trace_analyzer.extractors.metadata import extract_metadata
-        from playwright_trace_analyzer.extractors.actions import extract_actions
-        from playwright_trace_analyzer.extractors.console import (
-            extract_console_messages,
-        )
-        from playwright_trace_analyzer.extractors.network import (
-            extract_network_requests,
-        )
-        from playwright_trace_analyzer.extractors.errors import extract_errors
-        from playwright_trace_analyzer.extractors.screenshots import extract_screenshots
-
-        metadata = extract_metadata(events)
-        actions = extract_actions(events)
-        console_messages = extract_console_messages(events)
-        network_requests = extract_network_requests(zf, events)
-        errors = extract_errors(events, actions)
-        screenshots = extract_screenshots(events)
-
-        return TraceData(
-            metadata=metadata,
-            actions=actions,
-            console_messages=console_messages,
-            network_requests=network_requests,
-            errors=errors,
-            screenshots=screenshots,
+        if "network_requests" in names:
+            sections["network_requests"] = extract_network_requests(zf, jobs=jobs)
+
+    for name, extractor in extractors.items():
+        sections[name] = extractor.result()
+
+    # with `actions` extracted here as well, the error extractor has already merged them
+    if "errors" in sections and actions is not None and "actions" not in names:
+        sections["errors"] = merge_action_errors(
+            cast(list[TraceError], sections["errors"]), actions
         )
 
+    log.debug("trace sections loaded", trace_path=trace_path, sections=list(sections))
+    return sections
+
+
+def _build_section_extractors(names: set[str]) -> dict[str, SectionExtractor]:
+    from playwright_trace_analyzer.extractors.metadata import MetadataExtractor
+    from playwright_trace_analyzer.extractors.actions import ActionExtractor
+    from playwright_trace_analyzer.extractors.console import ConsoleExtractor
+    from playwright_trace_analyzer.extractors.errors import ErrorExtractor
+    from playwright_trace_analyzer.extractors.screenshots import ScreencastExtractor
+
+    extractors = {}
+
+    if "metadata" in names:
+        extractors["metadata"] = MetadataExtractor()
+
+    if "actions" in names:
+        extractors["actions"] = ActionExtractor()
+
+    if "console_messages" in names:
+        extractors["console_messages"] = ConsoleExtractor()
+
+    if "errors" in names:
+        extractors["errors"] = ErrorExtractor(extractors.get("actions"))
+
+    if "screenshots" in names:
+        extractors["screenshots"] = ScreencastExtractor()
+
+    return extractors
+
+
+def _run_section_extractors_per_entry(
+    zf: zipfile.ZipFile, names: set[str], jobs: int
+) -> dict[str, SectionExtractor]:
+    """
+    Run the section extractors over each .trace entry in a worker process and merge their state in archive order.
+    Shipping compact extractor state back is far cheaper than shipping decoded events.
+    """
+    per_entry = map_entries(zf, ".trace", _extract_entry_sections, names, jobs=jobs)
+    if not per_entry:
+        return _build_section_extractors(names)
+
+    extractors, *rest = per_entry
+    for entry_extractors in rest:
+        for name, extractor in extractors.items():
+            extractor.merge(entry_extractors[name])
+
+    return extractors
+
+
+def _extract_entry_sections(
+    zf: zipfile.ZipFile, name: str, names: set[str]
+) -> dict[str, SectionExtractor]:
+    extractors = _build_section_extractors(names)
+    dispatcher = EventDispatcher(extractors.values())
+
+    events = _iter_trace_entry(zf, name, dispatcher.event_filter())
+    dispatcher.run(_reorder_events(events))
+
+    return extractors
+
+
+def run_extractors(zf: zipfile.ZipFile, extractors: Iterable[EventExtractor]) -> None:
+    dispatcher = EventDispatcher(extractors)
+    dispatcher.run(_extract_events(zf, dispatcher.event_filter()))
+
+
+def map_entries[EntryT](
+    zf: zipfile.ZipFile,
+    suffix: str,
+    read_entry: Callable[..., EntryT],
+    *args: object,
+    jobs: int = 1,
+) -> list[EntryT]:
+    """
+    Apply `read_entry(zf, name, *args)` to every entry ending in `suffix`, returning results in archive order.
+
+    With `jobs` > 1 and more than one matching entry, each entry is read in a worker process that reopens the
+    archive, so `read_entry`, `args` and the results must be picklable.
+    """
+    names = [name for name in zf.namelist() if name.endswith(suffix)]
+
+    if jobs <= 1 or len(names) <= 1 or zf.filename is None:
+        return [read_entry(zf, name, *args) for name in names]
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(names))) as pool:
+        futures = [
+            pool.submit(_read_entry_in_worker, zf.filename, name, read_entry, args)
+            for name in names
+        ]
+        return [future.result() for future in futures]
+
+
+def _read_entry_in_worker[EntryT](
+    trace_path: str,
+    name: str,
+    read_entry: Callable[..., EntryT],
+    args: tuple[object, ...],
+) -> EntryT:
+    with zipfile.ZipFile(trace_path) as zf:
+        return read_entry(zf, name, *args)
+
+
+def _extract_events(
+    zf: zipfile.ZipFile, wants: Callable[[str], bool] | None = None
+) -> Iterator[dict]:
+    """
+    Yield the events of every .trace entry in timestamp order.
+
+    Each entry is already close to timestamp order, so rather than sorting everything the entries are streamed
+    through a small reorder buffer and k-way merged. Ties keep archive order, then line order.
+    """
+    streams = [
+        _reorder_events(_iter_trace_entry(zf, name, wants))
+        for name in zf.namelist()
+        if name.endswith(".trace")
+    ]
+    return heapq.merge(*streams, key=_event_sort_key)
+
+
+def _iter_trace_entry(
+    zf: zipfile.ZipFile, name: str, wants: Callable[[str], bool] | None
+) -> Iterator[dict]:
+    with zf.open(name) as f:
+        for lines in iter_line_batches(f):
+            if wants:
+                lines = [line for line in lines if _line_wanted(line, wants)]
+
+            yield from decode_lines(lines)
+
+
+def _reorder_events(
+    events: Iterable[dict], window: int = REORDER_WINDOW
+) -> Iterator[dict]:
+    """Sort a nearly-sorted stream, holding at most `window` events back."""
+    buffer: list[tuple[float, int, dict]] = []
+
+    for sequence, event in enumerate(events):
+        heapq.heappush(buffer, (_event_sort_key(event), sequence, event))
+        if len(buffer) > window:
+            yield heapq.heappop(buffer)[2]
+
+    while buffer:
+        yield heapq.heappop(buffer)[2]
+
+
+def _event_sort_key(event: dict) -> float:
+    return event.get("timestamp", 0)
 
-def _extract_events(zf: zipfile.ZipFile) -> list[dict]:
-    events = []
 
-    for name in zf.namelist():
-        if name.endswith(".trace"):
-            with zf.open(name) as f:
-                for line in f:
-                    line = line.decode("utf-8").strip()
-                    if line:
-                        events.append(json.loads(line))
+def _line_wanted(line: bytes, wants: Callable[[str], bool]) -> bool:
+    match = _EVENT_TYPE_PATTERN.match(line)
+    if match is None:
+        return True
 
-    events.sort(key=lambda e: e.get("timestamp", 0))
-    return events
+    return wants(match.group(1).decode())
 
 
 def group_events_by_type(events: list[dict]) -> dict[str, list[dict]]:
@@ -0,0 +1,63 @@
+"""
+Streaming quantile sketch with a relative error guarantee, after DDSketch (Masson et al., VLDB 2019).
+
+Values are counted in logarithmically sized buckets, so memory grows with the log of the value range rather than
+with the number of values, and sketches built on different workers merge exactly.
+"""
+
+import math
+from collections import Counter
+
+# values at or below this are counted as zero; latencies are in milliseconds, so this is a microsecond
+MIN_INDEXABLE_VALUE = 1e-3
+
+
+class QuantileSketch:
+    """Quantiles of non-negative values, each within `relative_accuracy` of the exact value for the same rank."""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        assert 0 < relative_accuracy < 1, "relative accuracy must be between 0 and 1"
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Counter[int] = Counter()
+        self._zero_count = 0
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.max = max(self.max, value)
+
+        if value <= MIN_INDEXABLE_VALUE:
+            self._zero_count += 1
+        else:
+            self._buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        assert other.relative_accuracy == self.relative_accuracy, (
+            "only sketches with the same accuracy can be merged"
+        )
+        self._buckets.update(other._buckets)
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float | None:
+        """The value at quantile `q` in [0, 1], or None for an empty sketch."""
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return 0.0
+
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                # the bucket covers (gamma^(index-1), gamma^index]; this point is within the accuracy of both ends
+                estimate = 2 * self._gamma**index / (self._gamma + 1)
+                return min(estimate, self.max)
+
+        return self.max
@@ -0,0 +1,165 @@
+"""
+Response bodies, read from the trace archive only when asked for.
+
+`.network` snapshots reference each body by the sha1 of a `resources/` entry; a `NetworkRequest` keeps only that
+reference, so listing requests never touches the bodies. Reading one streams its entry through an optional gzip
+decompressor and stops at a byte cap, so a large asset costs at most the cap in memory.
+"""
+
+import base64
+import codecs
+import re
+import zipfile
+import zlib
+from collections.abc import Iterator
+from typing import IO
+
+from playwright_trace_analyzer.models import NetworkRequest, ResponseBody
+
+DEFAULT_MAX_BODY_BYTES = 64 * 1024
+
+BODY_CHUNK_SIZE = 64 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# media types whose bodies are shown as text; anything else is sniffed or base64 encoded
+_TEXT_MEDIA_TYPE = re.compile(
+    r"text/.*|[\w.-]+/(?:[\w.-]+\+)?(?:json|xml|javascript|ecmascript|x-www-form-urlencoded|graphql)"
+)
+
+# media types that say nothing about the bytes, so valid UTF-8 is shown as text
+_OPAQUE_MEDIA_TYPES = {
+    "application/octet-stream",
+    "application/gzip",
+    "application/x-gzip",
+}
+
+_CHARSET = re.compile(r";\s*charset\s*=\s*\"?([\w.:-]+)", re.IGNORECASE)
+
+
+def open_response_body(
+    zf: zipfile.ZipFile, request: NetworkRequest
+) -> IO[bytes] | None:
+    """A stream of the body's stored bytes, or None when the trace holds no body for `request`."""
+    if request.body_sha1 is None:
+        return None
+
+    try:
+        return zf.open(f"resources/{request.body_sha1}")
+    except KeyError:
+        return None
+
+
+def read_response_body(
+    zf: zipfile.ZipFile,
+    request: NetworkRequest,
+    max_bytes: int | None = DEFAULT_MAX_BODY_BYTES,
+) -> ResponseBody | None:
+    """
+    The first `max_bytes` of the body (all of it when None), gunzipped when stored compressed and decoded as text
+    when the content type or the bytes allow, else base64 encoded.
+    """
+    stream = open_response_body(zf, request)
+    if stream is None:
+        return None
+
+    name = stream.name
+    data, truncated, decompressed = _read_stored(zf, stream, max_bytes)
+    encoding, content = _decode(data, request.content_type, truncated, decompressed)
+
+    return ResponseBody(
+        sha1=name.removeprefix("resources/"),
+        size=zf.getinfo(name).file_size,
+        encoding=encoding,
+        content=content,
+        truncated=truncated,
+        decompressed=decompressed,
+    )
+
+
+def _read_stored(
+    zf: zipfile.ZipFile, stream: IO[bytes], max_bytes: int | None
+) -> tuple[bytes, bool, bool]:
+    """The capped body, whether it was truncated and whether it was gunzipped."""
+    with stream:
+        head = stream.read(BODY_CHUNK_SIZE)
+        gunzip = head.startswith(_GZIP_MAGIC)
+
+        try:
+            data, truncated = _read_capped(_chunks(stream, head, gunzip), max_bytes)
+            return data, truncated, gunzip
+        except zlib.error:
+            pass
+
+    # the magic bytes were a coincidence; read the stored bytes again as they are
+    with zf.open(stream.name) as raw:
+        data, truncated = _read_capped(_chunks(raw, b"", False), max_bytes)
+    return data, truncated, False
+
+
+def _chunks(stream: IO[bytes], head: bytes, gunzip: bool) -> Iterator[bytes]:
+    """The body's bytes in chunks of at most `BODY_CHUNK_SIZE`, decompressed only as far as they are consumed."""
+
+    def raw() -> Iterator[bytes]:
+        if head:
+            yield head
+        while chunk := stream.read(BODY_CHUNK_SIZE):
+            yield chunk
+
+    if not gunzip:
+        yield from raw()
+        return
+
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    for chunk in raw():
+        while chunk and not decompressor.eof:
+            yield decompressor.decompress(chunk, BODY_CHUNK_SIZE)
+            chunk = decompressor.unconsumed_tail
+        if decompressor.eof:
+            return
+
+    yield decompressor.flush()
+
+
+def _read_capped(chunks: Iterator[bytes], max_bytes: int | None) -> tuple[bytes, bool]:
+    """Up to `max_bytes` from `chunks`, and whether there was more."""
+    data = bytearray()
+
+    for chunk in chunks:
+        if max_bytes is not None and len(data) + len(chunk) > max_bytes:
+            data += chunk[: max_bytes - len(data)]
+            return bytes(data), True
+        data += chunk
+
+    return bytes(data), False
+
+
+def _decode(
+    data: bytes, content_type: str | None, truncated: bool, decompressed: bool
+) -> tuple[str, str]:
+    """`("text", str)` or `("base64", str)` for the body's bytes."""
+    media_type, _, params = (content_type or "").partition(";")
+    media_type = media_type.strip().lower()
+
+    if _TEXT_MEDIA_TYPE.fullmatch(media_type):
+        charset = _CHARSET.search(";" + params)
+        try:
+            decoder = codecs.getincrementaldecoder(
+                charset.group(1) if charset else "utf-8"
+            )(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        # a cap can split a multi-byte character, whose partial bytes are dropped rather than replaced
+        return "text", decoder.decode(data, final=not truncated)
+
+    if not media_type or media_type in _OPAQUE_MEDIA_TYPES or decompressed:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            text = decoder.decode(data, final=not truncated)
+        except UnicodeDecodeError:
+            pass
+        else:
+            if "\x00" not in text:
+                return "text", text
+
+    return "base64", base64.b64encode(data).decode("ascii")
@@ -166,8 +166,15 @@ def synthetic_trace_zip(tmp_path_factory):
                     "status": 200,
                     "statusText": "OK",
                     "headers": [{"name": "Content-Type", "value": "application/json"}],
+                    "content": {
+                        "size": 17,
+                        "mimeType": "application/json",
+                        "_sha1": "body-data.json",
+                    },
                 },
                 "timestamp": 2600.0,
+                "_monotonicTime": 2600.0,
+                "pageref": "page@1",
                 "sizes": {
                     "responseBody": 1024,
                 },
@@ -186,6 +193,8 @@ def synthetic_trace_zip(tmp_path_factory):
                     "headers": [],
                 },
                 "timestamp": 3200.0,
+                "_monotonicTime": 3200.0,
+                "pageref": "page@1",
                 "sizes": {
                     "responseBody": 128,
                 },
@@ -205,6 +214,8 @@ def synthetic_trace_zip(tmp_path_factory):
                 },
                 "_failureText": "net::ERR_CONNECTION_REFUSED",
                 "timestamp": 4700.0,
+                "_monotonicTime": 4700.0,
+                "pageref": "page@2",
                 "sizes": {
                     "responseBody": 0,
                 },
@@ -223,6 +234,7 @@ def synthetic_trace_zip(tmp_path_factory):
         network_content = "\n".join(json.dumps(event) for event in network_events)
         zf.writestr("trace.network", network_content)
 
+        zf.writestr("resources/body-data.json", b'{"items": [1, 2]}')
         zf.writestr("resources/abc123def456", b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
         zf.writestr("resources/xyz789uvw012", b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
         zf.writestr("resources/orphan123frame", b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
@@ -235,6 +247,13 @@ def cli_runner():
     return CliRunner()
 
 
+@pytest.fixture(autouse=True)
+def trace_cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "trace-cache"
+    monkeypatch.setenv("PLAYWRIGHT_TRACE_ANALYZER_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
 @pytest.fixture(scope="session")
 def synthetic_trace_zip_with_images(tmp_path_factory):
     tmp_dir = tmp_path_factory.mktemp("traces_with_images")
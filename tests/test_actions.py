@@ -0,0 +1,61 @@
+import random
+
+from playwright_trace_analyzer.extractors.actions import ActionIndex
+from playwright_trace_analyzer.models import Action
+
+
+def _scan_enclosing(
+    actions: list[Action], page_id: str | None, time: float
+) -> Action | None:
+    running = [
+        (a.start_time, index, a)
+        for index, a in enumerate(sorted(actions, key=lambda a: a.start_time))
+        if (page_id is None or a.page_id == page_id)
+        and a.start_time <= time
+        and (a.end_time is None or time <= a.end_time)
+    ]
+    return max(running, key=lambda r: (r[0], r[1]))[2] if running else None
+
+
+def test_enclosing_matches_linear_scan():
+    rng = random.Random(7)
+    actions = []
+    for index in range(300):
+        start = rng.uniform(0, 1_000)
+        actions.append(
+            Action(
+                call_id=f"call-{index}",
+                class_name="Page",
+                method="click",
+                params={},
+                start_time=start,
+                # nested, overlapping and unfinished actions
+                end_time=None if index % 50 == 0 else start + rng.expovariate(1 / 20),
+                page_id=rng.choice(["page@1", "page@2", None]),
+            )
+        )
+
+    index = ActionIndex(actions)
+    for _ in range(2_000):
+        time = rng.uniform(-10, 1_100)
+        page_id = rng.choice(["page@1", "page@2", "page@3", None])
+        expected = (
+            None if page_id == "page@3" else _scan_enclosing(actions, page_id, time)
+        )
+        assert index.enclosing(page_id, time) is expected
+
+
+def test_attribute_skips_untimed_and_unenclosed_items():
+    action = Action(
+        call_id="call-1",
+        class_name="Page",
+        method="goto",
+        params={},
+        start_time=10,
+        end_time=20,
+        page_id="page@1",
+    )
+    index = ActionIndex([action])
+
+    items = [("page@1", 15.0), ("page@1", None), ("page@1", 25.0), ("page@2", 15.0)]
+    assert index.attribute(items, lambda item: item) == {"call-1": [("page@1", 15.0)]}
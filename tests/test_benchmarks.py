@@ -0,0 +1,25 @@
+from benchmarks.synthetic import TraceShape, write_synthetic_trace
+from playwright_trace_analyzer.parser import parse_trace_file
+
+
+def test_synthetic_trace_matches_shape(tmp_path):
+    shape = TraceShape(
+        actions=20,
+        console_per_action=3,
+        network_requests=15,
+        frames=30,
+        frame_snapshots=10,
+        frame_width=64,
+        frame_height=36,
+        trace_entries=2,
+    )
+    trace_path = write_synthetic_trace(tmp_path / "trace.zip", shape)
+
+    trace_data = parse_trace_file(trace_path)
+
+    assert len(trace_data.actions) == shape.actions
+    assert len(trace_data.console_messages) == shape.actions * shape.console_per_action
+    assert len(trace_data.network_requests) == shape.network_requests
+    assert len(trace_data.screenshots) == shape.frames
+    assert trace_data.metadata.viewport is not None
+    assert trace_data.metadata.viewport.width == shape.frame_width
@@ -0,0 +1,141 @@
+import json
+import shutil
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from playwright_trace_analyzer import cache, parser
+from playwright_trace_analyzer.cache import FrameDiffCache, TraceCache
+from playwright_trace_analyzer.cli import actions, metadata
+
+
+def test_repeat_command_skips_parsing(
+    cli_runner, synthetic_trace_zip, trace_cache_dir, monkeypatch
+):
+    first = cli_runner.invoke(actions, [str(synthetic_trace_zip)])
+    assert first.exit_code == 0
+    assert any(trace_cache_dir.iterdir())
+
+    def fail_load_sections(trace_path, names, *args):
+        raise AssertionError("trace should be served from the cache")
+
+    monkeypatch.setattr(parser, "load_sections", fail_load_sections)
+
+    second = cli_runner.invoke(actions, [str(synthetic_trace_zip)])
+    assert second.exit_code == 0
+    assert json.loads(second.output) == json.loads(first.output)
+
+
+def test_unwritable_cache_directory_is_skipped(
+    cli_runner, synthetic_trace_zip, tmp_path, monkeypatch
+):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setenv("PLAYWRIGHT_TRACE_ANALYZER_CACHE_DIR", str(blocker / "cache"))
+
+    result = cli_runner.invoke(metadata, [str(synthetic_trace_zip)])
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["browser_name"] == "chromium"
+
+
+def test_unopenable_frame_diff_cache_is_skipped(tmp_path, monkeypatch):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setenv("PLAYWRIGHT_TRACE_ANALYZER_CACHE_DIR", str(blocker / "cache"))
+
+    assert FrameDiffCache.from_env() is None
+
+
+def test_trace_key_changes_with_content(synthetic_trace_zip, tmp_path):
+    cache = TraceCache(tmp_path / "cache")
+    other_trace = tmp_path / "other.zip"
+    shutil.copy(synthetic_trace_zip, other_trace)
+
+    assert cache.trace_key(synthetic_trace_zip) == cache.trace_key(synthetic_trace_zip)
+
+    with open(other_trace, "ab") as f:
+        f.write(b"\0")
+
+    assert cache.trace_key(other_trace) != cache.trace_key(synthetic_trace_zip)
+
+
+def test_eviction_keeps_cache_bounded(tmp_path):
+    cache = TraceCache(tmp_path / "cache", max_bytes=4_000)
+
+    for i in range(20):
+        cache.put(f"key{i}", "actions", bytes(range(256)) * i)
+
+    total = sum(p.stat().st_size for p in cache.directory.glob("*.bin"))
+    assert total <= 4_000
+    assert cache.get("key19", "actions") == bytes(range(256)) * 19
+    assert cache.get("key0", "actions") is None
+
+
+def test_frame_diff_cache_round_trip(tmp_path):
+    path = tmp_path / "diffs.sqlite"
+    diffs = FrameDiffCache(path)
+    diffs.put("b", "a", 0.002, None)
+    assert diffs.get("a", "b") == (0.002, None)
+    diffs.close()
+
+    diffs = FrameDiffCache(path)
+    assert diffs.get("a", "b") == (0.002, None)
+    assert diffs.get("a", "c") == (None, None)
+    # a later thumbnail-only measurement never drops a known full fraction
+    diffs.put("a", "b", None, 0.004)
+    diffs.close()
+
+    diffs = FrameDiffCache(path)
+    assert diffs.get("b", "a") == (0.002, 0.004)
+    diffs.close()
+
+
+def test_frame_diff_cache_evicts_least_recently_used(tmp_path):
+    path = tmp_path / "diffs.sqlite"
+
+    for i in range(5):
+        diffs = FrameDiffCache(path, max_rows=3)
+        diffs.get("a", "0")
+        diffs.put("a", str(i), None, i / 10)
+        diffs.close()
+
+    diffs = FrameDiffCache(path, max_rows=3)
+    assert diffs.get("a", "0") == (None, 0.0)
+    assert diffs.get("a", "1") == (None, None)
+    assert diffs.get("a", "4") == (None, 0.4)
+    diffs.close()
+
+
+def test_frame_diff_cache_recovers_from_corrupt_file(tmp_path):
+    path = tmp_path / "diffs.sqlite"
+    path.write_bytes(b"not a database" * 100)
+
+    diffs = FrameDiffCache(path)
+    diffs.put("a", "b", 0.5, None)
+    diffs.close()
+
+    with closing(FrameDiffCache(path)) as diffs:
+        assert diffs.get("a", "b") == (0.5, None)
+
+
+def test_frame_diff_cache_keeps_locked_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "FRAME_DIFF_TIMEOUT", 0)
+    path = tmp_path / "diffs.sqlite"
+    with closing(FrameDiffCache(path)) as diffs:
+        diffs.put("a", "b", 0.5, None)
+
+    with (
+        closing(FrameDiffCache(path)) as diffs,
+        closing(sqlite3.connect(path)) as other,
+    ):
+        other.execute("BEGIN EXCLUSIVE")
+        # a locked read is a miss, not an error
+        assert diffs.get("a", "b") == (None, None)
+
+        with pytest.raises(sqlite3.OperationalError):
+            FrameDiffCache(path)
+
+    with closing(FrameDiffCache(path)) as diffs:
+        assert diffs.get("a", "b") == (0.5, None)
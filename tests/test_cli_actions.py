@@ -58,3 +58,56 @@ def test_actions_errors_only(cli_runner, synthetic_trace_zip):
     data = json.loads(result.output)
     assert len(data) == 1
     assert data[0]["error"] is not None
+
+
+def test_actions_json_keeps_float_timestamps(cli_runner, synthetic_trace_zip):
+    result = cli_runner.invoke(actions, [str(synthetic_trace_zip), "--format", "json"])
+
+    assert result.exit_code == 0
+    assert '"start_time": 2500.0' in result.output
+    assert '"end_time": 3500.0' in result.output
+
+
+def test_actions_with_network_and_console(cli_runner, synthetic_trace_zip):
+    result = cli_runner.invoke(
+        actions, [str(synthetic_trace_zip), "--with-network", "--with-console"]
+    )
+
+    assert result.exit_code == 0
+
+    goto, click = json.loads(result.output)
+    assert [r["url"] for r in goto["network_requests"]] == [
+        "https://example.com/api/data",
+        "https://example.com/missing",
+    ]
+    assert [m["text"] for m in goto["console_messages"]] == [
+        "Uncaught TypeError",
+        "deprecated API usage",
+    ]
+    assert [r["url"] for r in click["network_requests"]] == [
+        "https://example.com/api/submit"
+    ]
+    assert [m["text"] for m in click["console_messages"]] == ["normal log message"]
+
+
+def test_actions_with_network_markdown(cli_runner, synthetic_trace_zip):
+    result = cli_runner.invoke(
+        actions,
+        [str(synthetic_trace_zip), "--with-network", "--errors-only", "-f", "markdown"],
+    )
+
+    assert result.exit_code == 0
+    assert "**Network:**" in result.output
+    assert "POST https://example.com/api/submit" in result.output
+    assert "api/data" not in result.output
+
+
+def test_actions_ndjson(cli_runner, synthetic_trace_zip):
+    args = [str(synthetic_trace_zip), "--with-network", "--with-console"]
+    as_json = cli_runner.invoke(actions, [*args, "--format", "json"])
+    result = cli_runner.invoke(actions, [*args, "--format", "ndjson"])
+
+    assert result.exit_code == 0
+    assert [json.loads(line) for line in result.output.splitlines()] == json.loads(
+        as_json.output
+    )
@@ -1,6 +1,7 @@
 import json
 
 from playwright_trace_analyzer.cli import console
+from playwright_trace_analyzer.extractors.console import extract_console_messages
 
 
 def test_console_json(cli_runner, synthetic_trace_zip):
@@ -55,3 +56,35 @@ def test_console_level_filter(cli_runner, synthetic_trace_zip):
     data = json.loads(result.output)
     assert len(data) == 1
     assert data[0]["message_type"] == "error"
+
+
+def test_console_ndjson_matches_json(cli_runner, synthetic_trace_zip):
+    as_json = cli_runner.invoke(console, [str(synthetic_trace_zip), "--format", "json"])
+    result = cli_runner.invoke(
+        console, [str(synthetic_trace_zip), "--format", "ndjson", "--level", "error"]
+    )
+
+    assert result.exit_code == 0
+
+    lines = result.output.splitlines()
+    expected = [m for m in json.loads(as_json.output) if m["message_type"] == "error"]
+    assert [json.loads(line) for line in lines] == expected
+
+
+def test_console_location_numbers_are_integers():
+    (with_location, without_location) = extract_console_messages(
+        [
+            {
+                "type": "console",
+                "time": 1.0,
+                "location": {"url": "app.js", "lineNumber": 42.0, "columnNumber": "7"},
+            },
+            {"type": "console", "time": 2.0},
+        ]
+    )
+
+    assert with_location.location.line_number == 42
+    assert isinstance(with_location.location.line_number, int)
+    assert with_location.location.column_number == 7
+    assert without_location.location.line_number is None
+    assert without_location.location.column_number is None
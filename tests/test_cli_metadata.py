@@ -1,5 +1,6 @@
 import json
 
+from playwright_trace_analyzer import parser
 from playwright_trace_analyzer.cli import metadata
 
 
@@ -34,3 +35,22 @@ def test_metadata_markdown(cli_runner, synthetic_trace_zip):
     )
     assert "chrome" in result.output
     assert "my test title" in result.output
+
+
+def test_metadata_only_loads_metadata_section(
+    cli_runner, synthetic_trace_zip, monkeypatch
+):
+    loaded = []
+    original_load_sections = parser.load_sections
+
+    def recording_load_sections(trace_path, names, *args):
+        sections = original_load_sections(trace_path, names, *args)
+        loaded.extend(sections)
+        return sections
+
+    monkeypatch.setattr(parser, "load_sections", recording_load_sections)
+
+    result = cli_runner.invoke(metadata, [str(synthetic_trace_zip)])
+
+    assert result.exit_code == 0
+    assert loaded == ["metadata"]
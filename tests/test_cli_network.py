@@ -57,3 +57,95 @@ def test_network_ignore_pattern(cli_runner, synthetic_trace_zip):
 
     for req in data:
         assert "missing" not in req["url"]
+
+
+def test_network_status_class_and_method(cli_runner, synthetic_trace_zip):
+    result = cli_runner.invoke(
+        network, [str(synthetic_trace_zip), "--status", "4XX", "--method", "get"]
+    )
+
+    assert result.exit_code == 0
+    assert [r["url"] for r in json.loads(result.output)] == [
+        "https://example.com/missing"
+    ]
+
+
+def test_network_content_type_and_url_pattern(cli_runner, synthetic_trace_zip):
+    result = cli_runner.invoke(
+        network,
+        [
+            str(synthetic_trace_zip),
+            "--content-type",
+            "JSON",
+            "--url-pattern",
+            "/api/",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert [r["url"] for r in json.loads(result.output)] == [
+        "https://example.com/api/data"
+    ]
+
+
+def test_network_rejects_invalid_status(cli_runner, synthetic_trace_zip):
+    result = cli_runner.invoke(network, [str(synthetic_trace_zip), "--status", "4x"])
+
+    assert result.exit_code != 0
+    assert "not a status code" in result.output
+
+
+def test_network_bodies(cli_runner, synthetic_trace_zip):
+    result = cli_runner.invoke(
+        network, [str(synthetic_trace_zip), "--format", "json", "--bodies"]
+    )
+
+    assert result.exit_code == 0
+
+    data = json.loads(result.output)
+    assert data[0]["body"]["encoding"] == "text"
+    assert json.loads(data[0]["body"]["content"]) == {"items": [1, 2]}
+    assert data[1]["body"] is None
+
+    result = cli_runner.invoke(
+        network,
+        [
+            str(synthetic_trace_zip),
+            "--format",
+            "markdown",
+            "--bodies",
+            "--max-body-bytes",
+            "4",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "**Body:** (17 bytes stored, truncated)" in result.output
+    assert '```\n{"it\n```' in result.output
+
+
+def test_network_without_bodies_omits_them(cli_runner, synthetic_trace_zip):
+    result = cli_runner.invoke(network, [str(synthetic_trace_zip), "--format", "json"])
+
+    assert all("body" not in request for request in json.loads(result.output))
+
+
+def test_network_ndjson(cli_runner, synthetic_trace_zip):
+    as_json = cli_runner.invoke(network, [str(synthetic_trace_zip), "--format", "json"])
+    result = cli_runner.invoke(
+        network, [str(synthetic_trace_zip), "--format", "ndjson"]
+    )
+
+    assert result.exit_code == 0
+
+    lines = result.output.splitlines()
+    assert [json.loads(line) for line in lines] == json.loads(as_json.output)
+
+    result = cli_runner.invoke(
+        network,
+        [str(synthetic_trace_zip), "--format", "ndjson", "--failed-only", "--bodies"],
+    )
+
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [r["status"] for r in records] == [404, 0]
+    assert all(r["body"] is None for r in records)
@@ -0,0 +1,55 @@
+import json
+
+from benchmarks.synthetic import TraceShape, write_synthetic_trace
+from playwright_trace_analyzer.cli import network_stats
+from playwright_trace_analyzer.network_stats import path_template
+
+
+def test_network_stats_json(cli_runner, synthetic_trace_zip):
+    result = cli_runner.invoke(network_stats, [str(synthetic_trace_zip)])
+
+    assert result.exit_code == 0
+
+    groups = json.loads(result.output)
+    assert sum(g["count"] for g in groups) == 3
+    assert sum(g["failed"] for g in groups) == 2
+
+    api = next(g for g in groups if g["path"] == "/api/data")
+    assert api["host"] == "example.com"
+    assert api["content_type"] == "application/json"
+    assert api["p50_ms"] <= api["p95_ms"] <= api["p99_ms"] <= api["max_ms"]
+
+
+def test_network_stats_markdown_sorted_by_count(cli_runner, tmp_path):
+    shape = TraceShape(actions=2, network_requests=500, frames=1, trace_entries=3)
+    trace_path = write_synthetic_trace(tmp_path / "trace.zip", shape)
+
+    result = cli_runner.invoke(
+        network_stats,
+        [str(trace_path), "--sort", "count", "-n", "3", "-f", "markdown", "-j", "2"],
+    )
+
+    assert result.exit_code == 0
+    rows = [line for line in result.output.splitlines() if line.startswith("| GET")]
+    counts = [int(row.split("|")[5]) for row in rows]
+    assert len(counts) == 3
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_path_template():
+    assert path_template("https://api.example.com:8443/users/42/orders?page=2") == (
+        "api.example.com:8443",
+        "/users/{id}/orders",
+    )
+    assert path_template(
+        "https://example.com/items/3f2504e0-4f89-11d3-9a0c-0305e82c3301"
+    ) == ("example.com", "/items/{uuid}")
+    assert path_template("https://cdn.example.com/assets/0123456789abcdef0123.js") == (
+        "cdn.example.com",
+        "/assets/0123456789abcdef0123.js",
+    )
+    assert path_template("https://cdn.example.com/blobs/0123456789abcdef0123") == (
+        "cdn.example.com",
+        "/blobs/{hash}",
+    )
+    assert path_template("data:image/png;base64,iVBORw0KGgo=") == ("", "data:")
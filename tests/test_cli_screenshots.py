@@ -1,5 +1,7 @@
 import re
 
+from PIL import Image
+
 from playwright_trace_analyzer.cli import screenshots
 
 
@@ -185,3 +187,123 @@ def test_screenshots_dedupe_with_limit(
 
     files = list(output_dir.iterdir())
     assert len(files) == 1
+
+
+def test_screenshots_min_interval(cli_runner, synthetic_trace_zip, tmp_path):
+    output_dir = tmp_path / "screenshots_interval"
+    result = cli_runner.invoke(
+        screenshots,
+        [
+            str(synthetic_trace_zip),
+            "--output-dir",
+            str(output_dir),
+            "--min-interval-ms",
+            "3001",
+        ],
+    )
+
+    assert result.exit_code == 0
+    # page@1 frames are 3000ms apart; page@2's single frame is sampled independently
+    assert "Extracted 2 screenshots" in result.output
+
+
+def test_screenshots_max_fps_with_action_only(
+    cli_runner, synthetic_trace_zip, tmp_path
+):
+    output_dir = tmp_path / "screenshots_fps"
+    result = cli_runner.invoke(
+        screenshots,
+        [
+            str(synthetic_trace_zip),
+            "--output-dir",
+            str(output_dir),
+            "--action-only",
+            "--max-fps",
+            "1",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "Extracted 2 screenshots" in result.output
+
+
+def test_screenshots_downscaled_webp(
+    cli_runner, synthetic_trace_zip_with_images, tmp_path
+):
+    output_dir = tmp_path / "screenshots_webp"
+    result = cli_runner.invoke(
+        screenshots,
+        [
+            str(synthetic_trace_zip_with_images),
+            "--output-dir",
+            str(output_dir),
+            "--dedupe-threshold",
+            "0",
+            "--max-width",
+            "40",
+            "--format",
+            "webp",
+            "--quality",
+            "50",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "Extracted 3 screenshots" in result.output
+
+    files = sorted(output_dir.iterdir())
+    assert [f.name for f in files] == ["1000ms.webp", "1100ms.webp", "1200ms.webp"]
+    for file in files:
+        with Image.open(file) as img:
+            assert img.format == "WEBP"
+            assert img.size == (40, 40)
+
+
+def test_screenshots_max_width_keeps_jpeg(
+    cli_runner, synthetic_trace_zip_with_images, tmp_path
+):
+    output_dir = tmp_path / "screenshots_small"
+    result = cli_runner.invoke(
+        screenshots,
+        [
+            str(synthetic_trace_zip_with_images),
+            "--output-dir",
+            str(output_dir),
+            "--max-width",
+            "200",
+        ],
+    )
+
+    assert result.exit_code == 0
+
+    for file in output_dir.iterdir():
+        assert file.suffix == ".jpeg"
+        with Image.open(file) as img:
+            # narrower frames are never upscaled
+            assert img.size == (100, 100)
+
+
+def test_screenshots_reencode_keeps_undecodable_frames(
+    cli_runner, synthetic_trace_zip, tmp_path
+):
+    output_dir = tmp_path / "screenshots_webp"
+    result = cli_runner.invoke(
+        screenshots,
+        [
+            str(synthetic_trace_zip),
+            "--output-dir",
+            str(output_dir),
+            "--max-width",
+            "40",
+            "--format",
+            "webp",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Extracted 3 screenshots" in result.output
+
+    # the fixture's frames aren't valid images, so they are written as stored
+    files = sorted(output_dir.iterdir())
+    assert len(files) == 3
+    assert all(f.read_bytes().startswith(b"\x89PNG") for f in files)
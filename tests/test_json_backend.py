@@ -0,0 +1,64 @@
+import json
+import zipfile
+
+import pytest
+
+from playwright_trace_analyzer import json_backend
+from playwright_trace_analyzer.cli import actions, console, metadata, network, summary
+
+fast_backend = json_backend._orjson_backend()
+
+
+@pytest.mark.skipif(fast_backend is None, reason="orjson is not installed")
+@pytest.mark.parametrize("command", [summary, actions, console, network, metadata])
+@pytest.mark.parametrize(
+    "trace_fixture", ["synthetic_trace_zip", "synthetic_trace_zip_with_images"]
+)
+def test_backends_produce_identical_json(
+    cli_runner, command, trace_fixture, request, monkeypatch
+):
+    trace_path = str(request.getfixturevalue(trace_fixture))
+    monkeypatch.setenv("PLAYWRIGHT_TRACE_ANALYZER_NO_CACHE", "1")
+
+    outputs = []
+    for backend in [json_backend.STDLIB, fast_backend]:
+        monkeypatch.setattr(json_backend, "backend", backend)
+
+        for args in [[trace_path], [trace_path, "--compact"]]:
+            result = cli_runner.invoke(command, args)
+            assert result.exit_code == 0
+            outputs.append(json.loads(result.output))
+
+    assert all(output == outputs[0] for output in outputs)
+
+
+def test_compact_output_has_no_indentation(cli_runner, synthetic_trace_zip):
+    result = cli_runner.invoke(network, [str(synthetic_trace_zip), "--compact"])
+
+    assert result.exit_code == 0
+    assert result.output.count("\n") == 1
+    assert len(json.loads(result.output)) == 3
+
+
+@pytest.mark.parametrize(
+    "backend", [json_backend.STDLIB, fast_backend], ids=["json", "orjson"]
+)
+def test_lone_surrogate_console_text(cli_runner, tmp_path, backend, monkeypatch):
+    if backend is None:
+        pytest.skip("orjson is not installed")
+    monkeypatch.setattr(json_backend, "backend", backend)
+    monkeypatch.setenv("PLAYWRIGHT_TRACE_ANALYZER_NO_CACHE", "1")
+
+    # JSON.stringify escapes half of a cut emoji as a lone surrogate
+    events = [
+        {"type": "console", "messageType": "log", "text": "cut \ud83d", "time": 1.0},
+        {"type": "console", "messageType": "log", "text": "next", "time": 2.0},
+    ]
+    trace_path = tmp_path / "trace.zip"
+    with zipfile.ZipFile(trace_path, "w") as zf:
+        zf.writestr("trace.trace", "\n".join(json.dumps(e) for e in events))
+
+    result = cli_runner.invoke(console, [str(trace_path)])
+
+    assert result.exit_code == 0, result.output
+    assert [m["text"] for m in json.loads(result.output)] == ["cut \ud83d", "next"]
@@ -0,0 +1,35 @@
+import io
+import re
+
+from playwright_trace_analyzer.ndjson import (
+    decode_lines,
+    iter_line_batches,
+    iter_line_chunks,
+    lines_matching,
+)
+
+
+def test_lines_split_across_chunks_are_reassembled():
+    stream = io.BytesIO(b'{"a": 1}\n\n{"b": "two"}\r\n  \n{"c": [3]}')
+
+    decoded = [
+        value
+        for lines in iter_line_batches(stream, chunk_size=5)
+        for value in decode_lines(lines)
+    ]
+
+    assert decoded == [{"a": 1}, {"b": "two"}, {"c": [3]}]
+
+
+def test_matching_lines_are_found_across_chunks():
+    stream = io.BytesIO(b'{"a": 1}\n{"b": 22}\n{"c": 3, "d": 4}\n{"e": 5}')
+    pattern = re.compile(rb"\d")
+
+    matched = [
+        line
+        for chunk in iter_line_chunks(stream, chunk_size=4)
+        for line in lines_matching(chunk, re.compile(rb'"[bce]"'))
+    ]
+
+    assert matched == [b'{"b": 22}', b'{"c": 3, "d": 4}', b'{"e": 5}']
+    assert lines_matching(b"x1y2\nz", pattern) == [b"x1y2"]
@@ -0,0 +1,68 @@
+import zipfile
+
+import pytest
+
+from benchmarks.synthetic import TraceShape, write_synthetic_trace
+from playwright_trace_analyzer.cache import TraceCache
+from playwright_trace_analyzer.extractors.network import (
+    NetworkRequestFilter,
+    extract_network_requests,
+    iter_network_requests,
+    load_network_requests,
+)
+
+
+@pytest.mark.parametrize(
+    "request_filter",
+    [
+        NetworkRequestFilter(failed_only=True),
+        NetworkRequestFilter(statuses=("5xx", "404")),
+        NetworkRequestFilter(statuses=("304",), methods=frozenset({"GET"})),
+        NetworkRequestFilter(methods=frozenset({"POST"})),
+        NetworkRequestFilter(content_type="image/"),
+        NetworkRequestFilter(url_pattern="/static/", ignore_pattern="[05]$"),
+    ],
+)
+def test_filtered_read_matches_filtering_afterwards(tmp_path, request_filter):
+    shape = TraceShape(actions=4, network_requests=2_000, frames=1, trace_entries=2)
+    trace_path = write_synthetic_trace(tmp_path / "trace.zip", shape)
+
+    with zipfile.ZipFile(trace_path) as zf:
+        everything = extract_network_requests(zf)
+        filtered = extract_network_requests(zf, request_filter=request_filter)
+
+    expected = [r for r in everything if request_filter.accepts(r)]
+    assert filtered == expected
+    assert 0 < len(expected) < len(everything)
+
+
+def test_select_lines_tolerates_whitespace():
+    chunk = (
+        b'{"type": "resource-snapshot", "snapshot": {"response": {"status": 200}}}\n'
+        b'{"type": "resource-snapshot", "snapshot": {"response": {"status": 503}}}\n'
+    )
+    failing = chunk.splitlines()[1]
+
+    assert NetworkRequestFilter(failed_only=True).select_lines(chunk) == [failing]
+    assert NetworkRequestFilter(statuses=("5xx",)).select_lines(chunk) == [failing]
+    assert NetworkRequestFilter(statuses=("404",)).select_lines(chunk) == []
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_streamed_requests_match_loaded_ones(tmp_path, jobs):
+    shape = TraceShape(actions=4, network_requests=500, frames=1, trace_entries=2)
+    trace_path = write_synthetic_trace(tmp_path / "trace.zip", shape)
+    request_filter = NetworkRequestFilter(statuses=("2xx",))
+    cache = TraceCache(tmp_path / "cache")
+
+    with zipfile.ZipFile(trace_path) as zf:
+        everything = extract_network_requests(zf)
+
+    assert list(iter_network_requests(trace_path, jobs=jobs)) == everything
+    assert list(
+        iter_network_requests(trace_path, request_filter, cache, jobs)
+    ) == load_network_requests(trace_path, request_filter, jobs=jobs)
+
+    # a cached section is streamed from the cache
+    cache.put(cache.trace_key(trace_path), "network_requests", everything[:3])
+    assert list(iter_network_requests(trace_path, cache=cache)) == everything[:3]
@@ -0,0 +1,166 @@
+import json
+import zipfile
+
+from playwright_trace_analyzer import parser
+from playwright_trace_analyzer.parser import (
+    EventDispatcher,
+    parse_trace_file,
+    run_extractors,
+)
+
+
+class _RecordingExtractor:
+    def __init__(self, event_types):
+        self.event_types = event_types
+        self.events = []
+
+    def handle(self, event: dict) -> None:
+        self.events.append(event)
+
+
+def test_dispatcher_routes_by_type():
+    screencast = _RecordingExtractor(frozenset({"screencast-frame"}))
+    everything = _RecordingExtractor(None)
+
+    EventDispatcher([screencast, everything]).run(
+        [{"type": "before"}, {"type": "screencast-frame"}, {"type": "after"}]
+    )
+
+    assert [e["type"] for e in screencast.events] == ["screencast-frame"]
+    assert len(everything.events) == 3
+
+
+def test_run_extractors_custom_extractor(synthetic_trace_zip):
+    console = _RecordingExtractor(frozenset({"console"}))
+
+    with zipfile.ZipFile(synthetic_trace_zip) as zf:
+        run_extractors(zf, [console])
+
+    assert len(console.events) == 3
+    assert all(e["type"] == "console" for e in console.events)
+
+
+def test_trace_data_loads_sections_on_access(synthetic_trace_zip):
+    data = parse_trace_file(synthetic_trace_zip)
+    assert data.loaded_sections == []
+
+    assert data.metadata.browser_name == "chromium"
+    assert data.loaded_sections == ["metadata"]
+
+    assert len(data.errors) == 1
+    assert sorted(data.loaded_sections) == ["actions", "errors", "metadata"]
+
+
+def test_loading_errors_keeps_assigned_actions(synthetic_trace_zip, monkeypatch):
+    expected_errors = parse_trace_file(synthetic_trace_zip).errors
+
+    data = parse_trace_file(synthetic_trace_zip)
+    data.actions = data.actions[:1]
+
+    assert data.errors == expected_errors
+    assert len(data.actions) == 1
+    assert sorted(data.loaded_sections) == ["actions", "errors"]
+
+    # actions extracted earlier are reused rather than extracted again
+    requested = []
+    original_load_sections = parser.load_sections
+
+    def recording_load_sections(trace_path, names, *args):
+        requested.append(set(names))
+        return original_load_sections(trace_path, names, *args)
+
+    monkeypatch.setattr(parser, "load_sections", recording_load_sections)
+
+    data = parse_trace_file(synthetic_trace_zip)
+    assert len(data.actions) == 2
+    assert data.errors == expected_errors
+    assert requested == [{"actions"}, {"errors"}]
+    assert data.loaded_sections == ["actions", "errors"]
+
+
+def test_trace_data_prefetches_requested_sections(synthetic_trace_zip):
+    data = parse_trace_file(synthetic_trace_zip, ["console_messages", "screenshots"])
+
+    assert len(data.console_messages) == 3
+    assert sorted(data.loaded_sections) == ["console_messages", "screenshots"]
+
+
+def test_unwanted_events_are_not_decoded(tmp_path):
+    trace_path = tmp_path / "trace.zip"
+    lines = [
+        json.dumps({"type": "console", "text": "hello", "timestamp": 1.0}),
+        '{"type":"frame-snapshot","snapshot": <not decoded>',
+    ]
+
+    with zipfile.ZipFile(trace_path, "w") as zf:
+        zf.writestr("trace.trace", "\n".join(lines))
+
+    console = _RecordingExtractor(frozenset({"console"}))
+    everything = _RecordingExtractor(None)
+
+    with zipfile.ZipFile(trace_path) as zf:
+        run_extractors(zf, [console, everything])
+
+    assert [e["text"] for e in console.events] == ["hello"]
+    assert len(everything.events) == 1
+
+
+def test_parallel_decoding_matches_serial(tmp_path):
+    trace_path = tmp_path / "multi.zip"
+
+    with zipfile.ZipFile(trace_path, "w") as zf:
+        for context in range(3):
+            events = [
+                {
+                    "type": "before",
+                    "callId": f"call-{context}-{i}",
+                    "startTime": float(i * 10 + context),
+                    "class": "Page",
+                    "method": "click",
+                    "params": {},
+                }
+                for i in range(20)
+            ] + [
+                {"type": "console", "text": f"{context}-{i}", "timestamp": float(i)}
+                for i in range(20)
+            ]
+            zf.writestr(
+                f"{context}-trace.trace", "\n".join(json.dumps(e) for e in events)
+            )
+            snapshot = {
+                "type": "resource-snapshot",
+                "snapshot": {"request": {"url": f"https://example.com/{context}"}},
+            }
+            zf.writestr(f"{context}-trace.network", json.dumps(snapshot))
+
+    sections = ["actions", "console_messages", "network_requests"]
+    serial = parse_trace_file(trace_path, sections)
+    parallel = parse_trace_file(trace_path, sections, jobs=3)
+
+    assert parallel.actions == serial.actions
+    assert parallel.console_messages == serial.console_messages
+    assert parallel.network_requests == serial.network_requests
+    assert [r.url for r in parallel.network_requests] == [
+        "https://example.com/0",
+        "https://example.com/1",
+        "https://example.com/2",
+    ]
+
+
+def test_events_are_merged_in_timestamp_order(tmp_path):
+    trace_path = tmp_path / "merge.zip"
+
+    with zipfile.ZipFile(trace_path, "w") as zf:
+        for name, timestamps in [("a.trace", [1, 4, 3, 6]), ("b.trace", [2, 5, 0])]:
+            events = [
+                {"type": "screencast-frame", "timestamp": timestamp, "entry": name}
+                for timestamp in timestamps
+            ]
+            zf.writestr(name, "\n".join(json.dumps(e) for e in events))
+
+    frames = _RecordingExtractor(frozenset({"screencast-frame"}))
+
+    with zipfile.ZipFile(trace_path) as zf:
+        run_extractors(zf, [frames])
+
+    assert [e["timestamp"] for e in frames.events] == [0, 1, 2, 3, 4, 5, 6]
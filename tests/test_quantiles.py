@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from playwright_trace_analyzer.quantiles import QuantileSketch
+
+
+def _exact_quantile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("q", [0.0, 0.5, 0.95, 0.99, 1.0])
+def test_quantiles_within_relative_accuracy(q):
+    rng = random.Random(q)
+    values = [rng.lognormvariate(4, 1.5) for _ in range(20_000)]
+
+    sketch = QuantileSketch(0.01)
+    for value in values:
+        sketch.add(value)
+
+    exact = _exact_quantile(values, q)
+    estimate = sketch.quantile(q)
+    assert estimate is not None
+    assert abs(estimate - exact) <= 0.01 * exact
+
+
+def test_merged_sketch_equals_single_sketch():
+    rng = random.Random(1)
+    values = [rng.expovariate(0.01) for _ in range(5_000)] + [0.0, -1.0]
+
+    whole = QuantileSketch()
+    left = QuantileSketch()
+    right = QuantileSketch()
+    for index, value in enumerate(values):
+        whole.add(value)
+        (left if index % 3 else right).add(value)
+    left.merge(right)
+
+    assert left.count == whole.count == len(values)
+    for q in [0.0, 0.01, 0.5, 0.9, 0.999]:
+        assert left.quantile(q) == whole.quantile(q)
+
+
+def test_empty_sketch():
+    assert QuantileSketch().quantile(0.5) is None
@@ -0,0 +1,108 @@
+import base64
+import gzip
+import zipfile
+
+import pytest
+
+from playwright_trace_analyzer.models import NetworkRequest
+from playwright_trace_analyzer.response_bodies import (
+    open_response_body,
+    read_response_body,
+)
+
+
+def _request(sha1: str | None, content_type: str | None) -> NetworkRequest:
+    return NetworkRequest(
+        method="GET",
+        url="https://example.com/asset",
+        status=200,
+        status_text="OK",
+        duration_ms=1.0,
+        response_size=0,
+        content_type=content_type,
+        body_sha1=sha1,
+    )
+
+
+@pytest.fixture
+def bodies_zip(tmp_path):
+    path = tmp_path / "trace.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("resources/page.html", "<p>héllo</p>".encode())
+        zf.writestr("resources/latin.txt", "café".encode("latin-1"))
+        zf.writestr("resources/big.js", b"x" * 1_000_000)
+        zf.writestr("resources/logs.gz", gzip.compress(b"line\n" * 100_000))
+        zf.writestr("resources/image.png", b"\x89PNG\r\n\x1a\n\x00\x00")
+        zf.writestr("resources/fake.bin", b"\x1f\x8bnot gzip")
+    return zipfile.ZipFile(path)
+
+
+def test_text_body_is_decoded(bodies_zip):
+    body = read_response_body(
+        bodies_zip, _request("page.html", "text/html; charset=utf-8")
+    )
+
+    assert body is not None
+    assert (body.encoding, body.content, body.truncated) == (
+        "text",
+        "<p>héllo</p>",
+        False,
+    )
+    assert body.size == len("<p>héllo</p>".encode())
+
+
+def test_charset_from_content_type(bodies_zip):
+    body = read_response_body(
+        bodies_zip, _request("latin.txt", 'text/plain; charset="ISO-8859-1"')
+    )
+
+    assert body is not None
+    assert body.content == "café"
+
+
+def test_cap_truncates_without_splitting_characters(bodies_zip):
+    # the cap falls inside the two-byte é
+    body = read_response_body(bodies_zip, _request("page.html", "text/html"), 5)
+
+    assert body is not None
+    assert (body.content, body.truncated) == ("<p>h", True)
+
+    body = read_response_body(
+        bodies_zip, _request("big.js", "application/javascript"), 1000
+    )
+    assert body is not None
+    assert (body.content, body.truncated, body.size) == ("x" * 1000, True, 1_000_000)
+
+
+def test_gzipped_body_is_decompressed_up_to_the_cap(bodies_zip):
+    body = read_response_body(bodies_zip, _request("logs.gz", "application/gzip"), 12)
+
+    assert body is not None
+    assert (body.encoding, body.content) == ("text", "line\nline\nli")
+    assert body.decompressed and body.truncated
+
+    whole = read_response_body(
+        bodies_zip, _request("logs.gz", "application/gzip"), None
+    )
+    assert whole is not None
+    assert whole.content == "line\n" * 100_000
+    assert not whole.truncated
+
+
+def test_binary_bodies_are_base64(bodies_zip):
+    body = read_response_body(bodies_zip, _request("image.png", "image/png"))
+
+    assert body is not None
+    assert body.encoding == "base64"
+    assert base64.b64decode(body.content) == b"\x89PNG\r\n\x1a\n\x00\x00"
+
+    fake = read_response_body(bodies_zip, _request("fake.bin", None))
+    assert fake is not None
+    assert not fake.decompressed
+    assert base64.b64decode(fake.content) == b"\x1f\x8bnot gzip"
+
+
+def test_missing_bodies(bodies_zip):
+    assert read_response_body(bodies_zip, _request(None, "text/html")) is None
+    assert read_response_body(bodies_zip, _request("gone.html", "text/html")) is None
+    assert open_response_body(bodies_zip, _request("gone.html", "text/html")) is None
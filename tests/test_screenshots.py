@@ -0,0 +1,380 @@
+import io
+import itertools
+import os
+import random
+import zipfile
+
+import pytest
+from PIL import Image, ImageDraw, ImageFilter
+from pixelmatch.contrib.PIL import pixelmatch
+
+from benchmarks.synthetic import TraceShape, write_synthetic_trace
+from playwright_trace_analyzer.cache import FrameDiffCache
+from playwright_trace_analyzer.extractors import screenshots
+from playwright_trace_analyzer.extractors.screenshots import (
+    FrameIndex,
+    deduplicate_frames,
+    filter_action_frames,
+)
+from playwright_trace_analyzer.image_diff import count_different_pixels
+from playwright_trace_analyzer.models import Action, ScreencastFrame
+from playwright_trace_analyzer.parser import parse_trace_file
+
+
+@pytest.fixture
+def decoded_sha1s(monkeypatch):
+    """The sha1 of every frame decoded during the test, in decode order."""
+    decoded = []
+    original_init = screenshots.FrameImage.__init__
+
+    def recording_init(self, zf, sha1):
+        decoded.append(sha1)
+        original_init(self, zf, sha1)
+
+    monkeypatch.setattr(screenshots.FrameImage, "__init__", recording_init)
+    return decoded
+
+
+def _scan_action_frames(
+    frames: list[ScreencastFrame], actions: list[Action]
+) -> list[ScreencastFrame]:
+    best: dict[str, ScreencastFrame] = {}
+    for action in actions:
+        if action.end_time is None:
+            continue
+        for frame in frames:
+            if frame.page_id != action.page_id:
+                continue
+            if not (action.start_time <= frame.timestamp <= action.end_time):
+                continue
+            existing = best.get(action.call_id)
+            if existing is None or frame.timestamp > existing.timestamp:
+                best[action.call_id] = frame
+    return sorted(best.values(), key=lambda f: f.timestamp)
+
+
+def test_filter_action_frames_matches_linear_scan():
+    rng = random.Random(7)
+    pages = ["page@1", "page@2", "page@3"]
+
+    # coarse timestamps so frames share timestamps and land exactly on action bounds
+    frames = [
+        ScreencastFrame(
+            timestamp=float(rng.randrange(200)),
+            page_id=rng.choice(pages),
+            sha1=f"frame-{i}",
+            width=10,
+            height=10,
+        )
+        for i in range(500)
+    ]
+    frames.sort(key=lambda f: f.timestamp)
+
+    actions = []
+    for i in range(200):
+        start = float(rng.randrange(200))
+        end = None if i % 17 == 0 else start + rng.randrange(10)
+        actions.append(
+            Action(
+                call_id=f"call@{i}",
+                page_id=rng.choice(pages + ["page@missing"]),
+                class_name="Frame",
+                method="click",
+                params={},
+                start_time=start,
+                end_time=end,
+            )
+        )
+
+    assert filter_action_frames(frames, actions) == _scan_action_frames(frames, actions)
+
+
+def test_frame_index_between_is_inclusive():
+    frames = [
+        ScreencastFrame(
+            timestamp=float(t), page_id=page, sha1=f"{page}-{t}", width=1, height=1
+        )
+        for t in range(5)
+        for page in ["page@1", "page@2"]
+    ]
+    index = FrameIndex(frames)
+
+    assert [f.sha1 for f in index.between("page@1", 1, 3)] == [
+        "page@1-1",
+        "page@1-2",
+        "page@1-3",
+    ]
+    assert index.between("page@3", 0, 10) == []
+    assert index.last_between("page@2", 1.5, 2.5).sha1 == "page@2-2"
+    assert index.last_between("page@2", 5, 10) is None
+
+
+def _drawing(seed: int, mode: str) -> Image.Image:
+    rng = random.Random(seed)
+    img = Image.new(mode, (48, 32), (250, 250, 250, rng.randrange(256))[: len(mode)])
+    draw = ImageDraw.Draw(img)
+
+    for _ in range(6):
+        x, y = rng.randrange(48), rng.randrange(32)
+        fill = tuple(rng.randrange(256) for _ in mode)
+        draw.rectangle([x, y, x + rng.randrange(16), y + rng.randrange(8)], fill=fill)
+        draw.text((rng.randrange(48), rng.randrange(32)), "Ab", fill=fill)
+
+    return img.filter(ImageFilter.SMOOTH) if seed % 2 else img
+
+
+def _reencoded(img: Image.Image, quality: int) -> Image.Image:
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, format="JPEG", quality=quality)
+    return Image.open(buffer).convert(img.mode)
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA"])
+@pytest.mark.parametrize("threshold", [0.05, 0.1, 0.3])
+def test_count_different_pixels_matches_pixelmatch(mode, threshold):
+    for seed in range(12):
+        img = _drawing(seed, mode)
+        for other in [img, _reencoded(img, 40), _drawing(seed + 100, mode)]:
+            assert count_different_pixels(img, other, threshold) == pixelmatch(
+                img, other, threshold=threshold
+            )
+
+
+def _pixelmatch_dedupe(
+    frames: list[ScreencastFrame], zf: zipfile.ZipFile, threshold: float
+) -> list[ScreencastFrame]:
+    kept, last = [], None
+    for frame in frames:
+        img = Image.open(zf.open(f"resources/{frame.sha1}")).convert("RGBA")
+        if last is None or pixelmatch(last, img) / (img.width * img.height) > threshold:
+            kept.append(frame)
+            last = img
+    return kept
+
+
+def test_deduplicate_frames_keeps_pixelmatch_frames(
+    synthetic_trace_zip_with_images, tmp_path
+):
+    shape = TraceShape(
+        actions=4,
+        network_requests=1,
+        frames=24,
+        frame_snapshots=1,
+        frame_width=80,
+        frame_height=48,
+    )
+    generated = write_synthetic_trace(tmp_path / "trace.zip", shape)
+
+    for trace_path in [synthetic_trace_zip_with_images, generated]:
+        frames = parse_trace_file(trace_path).screenshots
+        with zipfile.ZipFile(trace_path) as zf:
+            for threshold in [0.001, 0.01, 0.2]:
+                assert deduplicate_frames(frames, zf, threshold) == _pixelmatch_dedupe(
+                    frames, zf, threshold
+                )
+
+
+def test_deduplicate_frames_prefilter_keeps_exact_frames(tmp_path, monkeypatch):
+    shape = TraceShape(actions=4, network_requests=1, frames=40, frame_snapshots=1)
+    trace_path = write_synthetic_trace(tmp_path / "trace.zip", shape)
+    frames = parse_trace_file(trace_path).screenshots
+
+    with zipfile.ZipFile(trace_path) as zf:
+        prefiltered = deduplicate_frames(frames, zf)
+
+        monkeypatch.setattr(screenshots, "PREFILTER_MIN_WIDTH", shape.frame_width + 1)
+        exact = deduplicate_frames(frames, zf)
+
+    assert prefiltered == exact
+    assert 1 < len(exact) < len(frames)
+
+
+@pytest.mark.parametrize("jobs", [2, 3])
+def test_deduplicate_frames_pipelined_matches_serial(
+    synthetic_trace_zip_with_images, tmp_path, jobs
+):
+    shape = TraceShape(
+        actions=4,
+        network_requests=1,
+        frames=60,
+        frame_snapshots=1,
+        frame_width=160,
+        frame_height=90,
+    )
+    generated = write_synthetic_trace(tmp_path / "trace.zip", shape)
+
+    for trace_path in [synthetic_trace_zip_with_images, generated]:
+        frames = parse_trace_file(trace_path).screenshots
+        with zipfile.ZipFile(trace_path) as zf:
+            for threshold in [0.001, 0.01, 0.2]:
+                # called directly, since deduplicate_frames caps jobs at the core count
+                pipelined = screenshots._iter_deduplicated_frames_pipelined(
+                    frames, screenshots.FrameImageCache(zf), threshold, jobs
+                )
+                assert list(pipelined) == deduplicate_frames(frames, zf, threshold)
+
+
+def test_deduplicate_frames_pipelined_keeps_undecodable_frames(synthetic_trace_zip):
+    frames = parse_trace_file(synthetic_trace_zip).screenshots
+
+    with zipfile.ZipFile(synthetic_trace_zip) as zf:
+        pipelined = screenshots._iter_deduplicated_frames_pipelined(
+            frames, screenshots.FrameImageCache(zf), 0.01, 2
+        )
+        assert list(pipelined) == frames
+
+
+def test_deduplicate_frames_decodes_each_sha1_once(tmp_path, decoded_sha1s):
+    shape = TraceShape(actions=4, network_requests=1, frames=40, frame_snapshots=1)
+    trace_path = write_synthetic_trace(tmp_path / "trace.zip", shape)
+    frames = parse_trace_file(trace_path).screenshots
+
+    with zipfile.ZipFile(trace_path) as zf:
+        deduplicate_frames(frames, zf)
+
+    assert (
+        len(decoded_sha1s) == len(set(decoded_sha1s)) == len({f.sha1 for f in frames})
+    )
+    assert len(decoded_sha1s) < len(frames)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_frame_diff_cache_skips_decoding_on_rerun(tmp_path, decoded_sha1s, jobs):
+    shape = TraceShape(actions=4, network_requests=1, frames=60, frame_snapshots=1)
+    trace_path = write_synthetic_trace(tmp_path / "trace.zip", shape)
+    frames = parse_trace_file(trace_path).screenshots
+
+    def dedupe(threshold: float) -> list[ScreencastFrame]:
+        diffs = FrameDiffCache(tmp_path / "diffs.sqlite")
+        try:
+            with zipfile.ZipFile(trace_path) as zf:
+                if jobs == 1:
+                    return deduplicate_frames(frames, zf, threshold, diffs=diffs)
+                return list(
+                    screenshots._iter_deduplicated_frames_pipelined(
+                        frames, screenshots.FrameImageCache(zf), threshold, jobs, diffs
+                    )
+                )
+        finally:
+            diffs.close()
+
+    with zipfile.ZipFile(trace_path) as zf:
+        expected = {t: deduplicate_frames(frames, zf, t) for t in [0.01, 0.05]}
+
+    assert dedupe(0.01) == expected[0.01]
+    decoded_sha1s.clear()
+    assert dedupe(0.01) == expected[0.01]
+    # only the first frame is decoded, to check it can serve as the reference
+    assert decoded_sha1s == [frames[0].sha1]
+
+    # full-resolution fractions answer other thresholds; only thumbnail-settled pairs may need a decode
+    assert dedupe(0.05) == expected[0.05]
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_extract_frame_resources(tmp_path, compression):
+    resources = {"a": b"first" * 1000, "b": b"second", "c": b""}
+    trace_path = tmp_path / "trace.zip"
+    with zipfile.ZipFile(trace_path, "w", compression) as zf:
+        zf.writestr("trace.trace", "")
+        for sha1, data in resources.items():
+            # an extra field makes the local header longer than the bare name
+            info = zipfile.ZipInfo(f"resources/{sha1}")
+            info.compress_type = compression
+            info.extra = b"\xca\xfe\x04\x00data"
+            zf.writestr(info, data)
+
+    out = tmp_path / "out"
+    out.mkdir()
+    targets = [
+        ("a", out / "1.jpeg"),
+        ("missing", out / "2.jpeg"),
+        ("b", out / "3.jpeg"),
+        ("a", out / "4.jpeg"),
+        # the last write to a path wins, as with sequential writes
+        ("a", out / "5.jpeg"),
+        ("b", out / "5.jpeg"),
+        ("c", out / "6.jpeg"),
+    ]
+
+    with zipfile.ZipFile(trace_path) as zf:
+        assert screenshots.extract_frame_resources(zf, targets) == 6
+
+    assert sorted(p.name for p in out.iterdir()) == [
+        "1.jpeg",
+        "3.jpeg",
+        "4.jpeg",
+        "5.jpeg",
+        "6.jpeg",
+    ]
+    assert (out / "1.jpeg").read_bytes() == resources["a"]
+    assert (out / "4.jpeg").read_bytes() == resources["a"]
+    assert (out / "5.jpeg").read_bytes() == resources["b"]
+    assert (out / "6.jpeg").read_bytes() == b""
+
+
+def test_extract_frame_resources_streams_after_short_copy(tmp_path, monkeypatch):
+    data = b"frame" * 1000
+    trace_path = tmp_path / "trace.zip"
+    with zipfile.ZipFile(trace_path, "w") as zf:
+        zf.writestr("resources/a", data)
+
+    calls = []
+
+    def short_copy(src, dst, count, offset_src=None, offset_dst=None):
+        calls.append(count)
+        # the first call copies part of the entry, then the source appears to end early
+        if len(calls) > 1:
+            return 0
+        return os.write(dst, os.pread(src, min(count, 100), offset_src))
+
+    monkeypatch.setattr(os, "copy_file_range", short_copy, raising=False)
+
+    with zipfile.ZipFile(trace_path) as zf:
+        assert (
+            screenshots.extract_frame_resources(zf, [("a", tmp_path / "a.jpeg")]) == 1
+        )
+
+    assert len(calls) == 2
+    assert (tmp_path / "a.jpeg").read_bytes() == data
+
+
+def test_reverse_dedupe_stops_at_limit(tmp_path, decoded_sha1s):
+    shape = TraceShape(actions=4, network_requests=1, frames=200, frame_snapshots=1)
+    trace_path = write_synthetic_trace(tmp_path / "trace.zip", shape)
+    frames = parse_trace_file(trace_path).screenshots
+
+    with zipfile.ZipFile(trace_path) as zf:
+        kept = screenshots.iter_deduplicated_frames(frames, zf, reverse=True)
+        last_two = list(itertools.islice(kept, 2))
+
+    assert last_two[0] == frames[-1]
+    assert last_two[1].timestamp < last_two[0].timestamp
+    # two scenes of ten frames each, two encodings per scene
+    assert len(decoded_sha1s) <= 5
+
+
+def test_decimate_frames_per_page():
+    frames = [
+        ScreencastFrame(
+            timestamp=t, page_id=page, sha1=f"{page}-{t}", width=1, height=1
+        )
+        for t, page in [
+            (0, "page@1"),
+            (10, "page@2"),
+            (30, "page@1"),
+            (40, "page@2"),
+            (50, "page@1"),
+            (60, "page@1"),
+            (100, "page@1"),
+        ]
+    ]
+
+    kept = screenshots.decimate_frames(frames, 50)
+
+    assert [f.sha1 for f in kept] == [
+        "page@1-0",
+        "page@2-10",
+        "page@1-50",
+        "page@1-100",
+    ]